@@ -1,14 +1,120 @@
-from fastapi import FastAPI, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, Form, Query
+from fastapi.responses import Response, StreamingResponse
+from cachetools import LRUCache
+import asyncio
+import hashlib
+import logging
+import orjson
 import tempfile
 import os
+import sys
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, BinaryIO
 
+from core.config import load_env, use_llm_explainer
+
+# Before the core imports below: some modules read their settings (e.g. SHOW_TECH_DETAILS) at import.
+load_env()
+
+from core.cache import SemanticCache, semantic_cache_enabled, semantic_cache_threshold
 from core.workflow import build_plan_app
+from core.stl import get_or_compute
+from core.nodes.explain_plan_llm import explain_plan_llm_stream, fallback_explanation
 
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_BYTES = 1 << 20  # 1 MiB
+
+
+# Only stage uploads on tmpfs when it has room for several large STLs at once: Docker's default
+# /dev/shm is 64 MB, where concurrent uploads would fail with ENOSPC.
+SHM_MIN_FREE_BYTES = 512 << 20  # 512 MiB
+
+
+def _shm_has_room() -> bool:
+    try:
+        st = os.statvfs("/dev/shm")
+    except OSError:
+        return False
+    return os.access("/dev/shm", os.W_OK) and st.f_bavail * st.f_frsize >= SHM_MIN_FREE_BYTES
+
+
+@lru_cache(maxsize=1)
+def _upload_tmpdir() -> str:
+    """
+    Where uploaded STLs are staged before analysis (override with SLICEBUDDY_TMPDIR).
+    Defaults to tmpfs on Linux when it's writable and large enough: the file is read straight back by the
+    STL analyzer, so it never needs a disk. Otherwise the regular temp dir.
+    Created on first use (not at import).
+    """
+    configured = os.getenv("SLICEBUDDY_TMPDIR")
+    if configured:
+        os.makedirs(configured, exist_ok=True)
+        return configured
+    if sys.platform.startswith("linux") and _shm_has_room():
+        try:
+            os.makedirs("/dev/shm/slicebuddy", exist_ok=True)
+            return "/dev/shm/slicebuddy"
+        except OSError:
+            pass
+    return tempfile.gettempdir()
+
+
+def _warm_up() -> None:
+    """
+    Open the vector store and build the OpenAI clients now, so the first /plan doesn't pay for
+    chromadb/langchain_openai imports, the store load and client setup. Best-effort: a missing key or
+    index only means the first request does the work (and reports the error) as before; the failure is
+    logged here so a bad key or a corrupt index shows up at startup.
+    """
+    if not use_llm_explainer():
+        return
+    try:
+        from core.nodes.explain_plan_llm import _get_llm
+        from core.rag.retriever import get_vectorstore
+    except Exception:
+        logger.exception("Warm-up skipped: the LLM/RAG modules failed to import")
+        return
+
+    for warm in (get_vectorstore, _get_llm):
+        try:
+            warm()
+        except Exception:
+            logger.exception("Warm-up step %s failed", warm.__name__)
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    await asyncio.to_thread(_warm_up)
+    yield
+
+
+app = FastAPI(lifespan=_lifespan)
 plan_app = build_plan_app()
+plan_app_no_explain = build_plan_app(explain=False)  # /plan/stream explains on its own
+
+# Same STL bytes + same use text -> same plan. Skip the whole graph (STL parse + LLM) on repeats.
+_plan_cache: LRUCache = LRUCache(maxsize=128)
+_plan_cache_lock = asyncio.Lock()
+
+
+def _embed_query(text: str) -> list[float]:
+    from core.rag.retriever import get_embeddings
+
+    return get_embeddings().embed_query(text)
+
+
+# Identical /plan requests already running: later arrivals await the same graph run (one LLM call).
+_plan_inflight: dict[str, asyncio.Future] = {}
+
+# Optional second tier: same STL bytes + a near-identical use text (see core.cache).
+_semantic_cache = (
+    SemanticCache(_embed_query, threshold=semantic_cache_threshold()) if semantic_cache_enabled() else None
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,36 +127,264 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+_chunk_buffers = threading.local()
+
+
+def _chunk_buffer() -> bytearray:
+    """Per-thread reusable copy buffer: uploads are copied without allocating a new bytes per chunk."""
+    buf = getattr(_chunk_buffers, "buf", None)
+    if buf is None:
+        buf = _chunk_buffers.buf = bytearray(UPLOAD_CHUNK_BYTES)
+    return buf
+
+
+def _save_upload(src: BinaryIO, suffix: str) -> tuple[str, str]:
+    """Copy an uploaded file into a named temp file. Returns (path, content hash)."""
+    digest = hashlib.blake2b(digest_size=16)
+    buf = _chunk_buffer()
+    view = memoryview(buf)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=_upload_tmpdir()) as tmp:
+        while n := src.readinto(buf):
+            digest.update(view[:n])
+            tmp.write(view[:n])
+        return tmp.name, digest.hexdigest()
+
+
+def _remove_upload(path: str) -> None:
+    try:
+        os.remove(path)
+    except Exception:
+        pass
+
+
+def _response_payload(result: dict) -> dict:
+    # Return only what UI needs (keep it simple)
+    return {
+        "stop": bool(result.get("stop")),
+        "model_overview": result.get("model_overview"),
+        "plan": result.get("plan"),
+        "warnings": result.get("warnings", []),
+        "risks": result.get("risks", {}),
+        "plan_explanation": result.get("plan_explanation", ""),
+        "stl_features": result.get("stl_features", {}),
+    }
+
+
+# orjson instead of the stdlib encoder for responses: numpy scalars pass through as numbers, output is UTF-8.
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _dumps(data) -> bytes:
+    return orjson.dumps(data, option=_ORJSON_OPTS)
+
+
+def _json_response(payload: dict) -> Response:
+    return Response(_dumps(payload), media_type="application/json")
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {_dumps(data).decode('utf-8')}\n\n"
+
+
+def _retrieve_exception(task: asyncio.Future) -> None:
+    if not task.cancelled():
+        task.exception()  # every waiter may be gone: retrieve it so asyncio doesn't log "never retrieved"
+
+
+def _discard_when_done(task: asyncio.Future, path: str) -> None:
+    """Delete the upload at `path` once `task`, which reads it, has finished."""
+
+    def done(t: asyncio.Future) -> None:
+        _retrieve_exception(t)
+        _remove_upload(path)
+
+    task.add_done_callback(done)
+
+
+def _start_plan(state: dict, graph=plan_app) -> asyncio.Future:
+    """
+    graph.invoke(state) in a worker thread (the graph is synchronous: STL parsing + LLM call).
+    The run owns the upload at state["stl_path"] and deletes it when it finishes, not when a waiter leaves.
+    """
+    task = asyncio.ensure_future(asyncio.to_thread(graph.invoke, state))
+    _discard_when_done(task, state["stl_path"])
+    return task
+
+
+async def _invoke_shared(cache_key: str, state: dict, graph=plan_app) -> dict:
+    """
+    graph.invoke(state), coalesced by cache_key: concurrent requests for the same STL + use text share
+    one run instead of each paying for the graph and the LLM explanation. The OpenAI chat API has no
+    batch forward pass to group *different* prompts into, so identical prompts are what can be merged.
+    Takes ownership of the upload at state["stl_path"]: a new run deletes it when done; a caller joining
+    a run already in flight deletes its own copy right away (the run reads the first caller's).
+    """
+    # No await between the lookup and the insert, so this is atomic on the event loop.
+    task = _plan_inflight.get(cache_key)
+    if task is None:
+        task = _plan_inflight[cache_key] = _start_plan(state, graph)
+        task.add_done_callback(lambda _: _plan_inflight.pop(cache_key, None))
+    else:
+        _release_upload(state["stl_path"])
+    # shield: one waiter disconnecting must not cancel the run the others are waiting on
+    return await asyncio.shield(task)
+
+
+# Uploads a background STL prefetch is still reading (see _cached_payload / _release_upload).
+_upload_readers: dict[str, asyncio.Future] = {}
+
+
+def _release_upload(path: str) -> None:
+    """Delete a request's upload now, or once a prefetch still reading it is done."""
+    reader = _upload_readers.get(path)
+    if reader is not None and not reader.done():
+        reader.add_done_callback(lambda _: _remove_upload(path))
+    else:
+        _remove_upload(path)
+
+
+async def _cached_payload(
+    cache_key: str, stl_hash: str, use: str, stl_path: str
+) -> tuple[dict | None, list[float] | None]:
+    """
+    Exact cache, then the optional semantic cache. Returns (cached payload or None, the embedding of `use`
+    if one was computed, to hand to _store_payload).
+    Only the semantic lookup has anything to wait on (an embeddings round-trip), so that's when the STL is
+    parsed alongside it: on a miss STL_ANALYZE then finds the features in core.stl's cache. With the
+    semantic cache off (the default) there is nothing to overlap.
+    The semantic tier is best-effort: if embedding fails (outage, bad key, rate limit) it counts as a miss
+    and the pipeline answers.
+    """
+    async with _plan_cache_lock:
+        cached = _plan_cache.get(cache_key)
+    if cached is not None or _semantic_cache is None:
+        return cached, None
+
+    prefetch = _upload_readers[stl_path] = asyncio.ensure_future(asyncio.to_thread(get_or_compute, stl_path))
+    prefetch.add_done_callback(_retrieve_exception)  # a failed parse resurfaces in STL_ANALYZE
+    prefetch.add_done_callback(lambda _: _upload_readers.pop(stl_path, None))
+    try:
+        vector = await asyncio.to_thread(_semantic_cache.embed, use)
+        cached = _semantic_cache.get(stl_hash, use, vector=vector)
+    except Exception:
+        logger.warning("Semantic cache lookup failed; treating it as a miss", exc_info=True)
+        cached, vector = None, None
+    if cached is None:
+        await asyncio.wait([prefetch])  # the plan run reads the same upload next
+    return cached, vector
+
+
+async def _store_payload(
+    cache_key: str, stl_hash: str, use: str, payload: dict, vector: list[float] | None = None
+) -> None:
+    async with _plan_cache_lock:
+        _plan_cache[cache_key] = payload
+    if _semantic_cache is None:
+        return
+    try:
+        await asyncio.to_thread(_semantic_cache.put, stl_hash, use, payload, vector)
+    except Exception:
+        # best-effort, like the lookup: the plan is already computed
+        logger.warning("Semantic cache insert failed", exc_info=True)
+
+
 @app.post("/plan")
 async def plan_endpoint(
     use: str = Form(...),
-    stl: UploadFile = File(...)
+    stl: UploadFile = File(...),
+    nocache: bool = Query(False),
 ):
-    # Save uploaded STL to a temp file
-    suffix = ".stl"
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        contents = await stl.read()
-        tmp.write(contents)
-        tmp_path = tmp.name
+    # Save uploaded STL to a temp file (chunked, so the whole upload never sits in memory).
+    # One worker-thread hop for the whole copy instead of one per awaited chunk.
+    tmp_path, stl_hash = await asyncio.to_thread(_save_upload, stl.file, ".stl")
+    cache_key = f"{stl_hash}:{use}"
 
+    handed_off = False  # once the plan run owns the upload, this request must not delete it
     try:
-        result = plan_app.invoke({
-            "description": use,
-            "stl_path": tmp_path,
-        })
-
-        # Return only what UI needs (keep it simple)
-        return JSONResponse({
-            "stop": bool(result.get("stop")),
-            "model_overview": result.get("model_overview"),
-            "plan": result.get("plan"),
-            "warnings": result.get("warnings", []),
-            "risks": result.get("risks", {}),
-            "plan_explanation": result.get("plan_explanation", ""),
-            "stl_features": result.get("stl_features", {}),
-        })
+        cached, vector = (None, None) if nocache else await _cached_payload(cache_key, stl_hash, use, tmp_path)
+        if cached is not None:
+            return _json_response(cached)
+
+        state = {"description": use, "stl_path": tmp_path}
+        handed_off = True
+        if nocache:
+            result = await asyncio.shield(_start_plan(state))
+        else:
+            result = await _invoke_shared(cache_key, state)
+
+        payload = _response_payload(result)
+        await _store_payload(cache_key, stl_hash, use, payload, vector)
+        return _json_response(payload)
     finally:
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
\ No newline at end of file
+        if not handed_off:
+            _release_upload(tmp_path)
+
+
+async def _replay_events(payload: dict) -> AsyncIterator[str]:
+    """A cached /plan payload in the /plan/stream event shape: plan, the explanation as one token, done."""
+    explanation = payload.get("plan_explanation") or ""
+    if payload.get("stop") or not explanation:
+        yield _sse("plan", payload)  # a stop message travels inside the plan event, as when streamed live
+    else:
+        yield _sse("plan", {**payload, "plan_explanation": ""})
+        yield _sse("token", explanation)
+    yield _sse("done", {})
+
+
+@app.post("/plan/stream")
+async def plan_stream_endpoint(
+    use: str = Form(...),
+    stl: UploadFile = File(...),
+    nocache: bool = Query(False),
+):
+    """
+    Server-Sent Events version of /plan.
+    Emits `plan` (same payload as /plan, without the LLM explanation) as soon as the
+    deterministic pipeline finishes, then `token` events with explanation text, then `done`.
+    If the LLM fails mid-stream: `error`, then the deterministic Model Checks as a `token`, then `done`.
+    Shares /plan's response caches (a hit replays the cached explanation as a single `token`);
+    identical concurrent requests share one pipeline run.
+    """
+    tmp_path, stl_hash = await asyncio.to_thread(_save_upload, stl.file, ".stl")
+    cache_key = f"{stl_hash}:{use}"
+
+    handed_off = False
+    try:
+        cached, vector = (None, None) if nocache else await _cached_payload(cache_key, stl_hash, use, tmp_path)
+        if cached is not None:
+            return StreamingResponse(_replay_events(cached), media_type="text/event-stream")
+
+        state = {"description": use, "stl_path": tmp_path}
+        handed_off = True
+        if nocache:
+            result = await asyncio.shield(_start_plan(state, plan_app_no_explain))
+        else:
+            # Own key: this graph stops before EXPLAIN_PLAN, so its result isn't /plan's.
+            result = await _invoke_shared(f"stream:{cache_key}", state, plan_app_no_explain)
+    finally:
+        if not handed_off:
+            _release_upload(tmp_path)
+
+    async def events() -> AsyncIterator[str]:
+        payload = _response_payload(result)
+        yield _sse("plan", payload)
+        # rag_context is only present when the LLM path is enabled
+        if result.get("stop") or "rag_context" not in result:
+            await _store_payload(cache_key, stl_hash, use, payload, vector)
+        else:
+            parts: list[str] = []
+            try:
+                async for text in explain_plan_llm_stream(result):
+                    parts.append(text)
+                    yield _sse("token", text)
+            except Exception:
+                logger.exception("Streaming the plan explanation failed")
+                message = "The AI explanation is unavailable right now; showing the model checks only."
+                yield _sse("error", {"message": message})
+                yield _sse("token", fallback_explanation(result))
+            else:
+                explained = {**payload, "plan_explanation": "".join(parts)}
+                await _store_payload(cache_key, stl_hash, use, explained, vector)
+        yield _sse("done", {})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
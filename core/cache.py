@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, List, Sequence, Tuple
+
+import numpy as np
+
+
+def semantic_cache_enabled() -> bool:
+    """
+    Off by default: a hit returns the plan computed for a *different* (if near-identical) description.
+    Set SLICEBUDDY_SEMANTIC_CACHE=true to enable; needs the embeddings client (OPENAI_API_KEY).
+    """
+    return os.getenv("SLICEBUDDY_SEMANTIC_CACHE", "false").lower() in ("1", "true", "yes")
+
+
+def semantic_cache_threshold() -> float:
+    return float(os.getenv("SLICEBUDDY_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+
+
+class SemanticCache:
+    """
+    Second-tier response cache: a lookup hits when an earlier text in the same scope (e.g. the same
+    STL hash) has cosine similarity >= threshold with the new one. Brute-force over the scope's entries,
+    which stays small; LRU-bounded to maxsize entries overall. Thread-safe; embed() may block (network).
+    """
+
+    def __init__(self, embed: Callable[[str], List[float]], threshold: float = 0.95, maxsize: int = 256) -> None:
+        self.embed = embed
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[np.ndarray, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _unit(self, text: str, vector: Sequence[float] | None = None) -> np.ndarray:
+        v = np.asarray(self.embed(text) if vector is None else vector, dtype=np.float32)
+        return v / max(float(np.linalg.norm(v)), 1e-12)
+
+    def get(self, scope: str, text: str, vector: Sequence[float] | None = None) -> Any | None:
+        """`vector`: text's embedding, if the caller already has it (otherwise embed() is called)."""
+        with self._lock:
+            candidates = [(k, vec) for k, (vec, _) in self._entries.items() if k[0] == scope]
+        if not candidates:
+            return None
+
+        q = self._unit(text, vector)
+        sims = np.stack([vec for _, vec in candidates]) @ q
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+
+        key = candidates[best][0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:  # evicted meanwhile
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, scope: str, text: str, value: Any, vector: Sequence[float] | None = None) -> None:
+        vec = self._unit(text, vector)
+        with self._lock:
+            self._entries[(scope, text)] = (vec, value)
+            self._entries.move_to_end((scope, text))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
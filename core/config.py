@@ -1,10 +1,56 @@
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
+from pathlib import Path
+from typing import Final
 
+@lru_cache(maxsize=1)
 def load_env() -> None:
-    """Load environment variables from a local .env file (if present)."""
+    """
+    Load environment variables from a local .env file (if present).
+    Set SKIP_DOTENV=true where the environment is injected (containers) to skip the file lookup.
+    Runs once per process; later calls (from other entry points / modules) are no-ops.
+    """
+    if os.getenv("SKIP_DOTENV", "false").lower() in ("1", "true", "yes"):
+        return
+    from dotenv import load_dotenv
+
     load_dotenv()
 
+def use_llm_explainer() -> bool:
+    """USE_LLM_EXPLAINER (default true): run RAG + the LLM explanation after the deterministic plan."""
+    return os.getenv("USE_LLM_EXPLAINER", "true").lower() in ("1", "true", "yes")
+
+
+def env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+# Geometry thresholds shared by the planning nodes (orientation, slicer settings, risks), so the advice
+# they give stays consistent. Resolved once at import; override via env to tune without code changes.
+TALL_ASPECT_RATIO: Final[float] = env_float("SLICEBUDDY_TALL_ASPECT_RATIO", 3.0)          # height / width
+CONTACT_AREA_LOW_MM2: Final[float] = env_float("SLICEBUDDY_CONTACT_LOW_MM2", 500)         # "tiny" bed contact
+CONTACT_RATIO_POINTY: Final[float] = env_float("SLICEBUDDY_CONTACT_RATIO_POINTY", 0.15)   # pointy/edge contact
+
+
 def get_openai_key() -> str | None:
     """Return the OpenAI API key from environment variables."""
-    return os.getenv("OPENAI_API_KEY")
\ No newline at end of file
+    return os.getenv("OPENAI_API_KEY")
+
+
+def cache_dir(*parts: str) -> Path:
+    """
+    Local cache directory for derived data (e.g. STL analysis results).
+    SLICEBUDDY_CACHE_DIR overrides the default ($XDG_CACHE_HOME or ~/.cache)/slicebuddy.
+    """
+    root = os.getenv("SLICEBUDDY_CACHE_DIR") or os.path.join(
+        os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "slicebuddy"
+    )
+    return Path(root, *parts)
+
+
+def vector_store_backend() -> str:
+    """
+    RAG vector store: "numpy" (default; brute-force search, fine for the small knowledge base) or "chroma".
+    Set SLICEBUDDY_VECTOR_STORE=chroma if the corpus grows large enough to need an ANN index.
+    """
+    return os.getenv("SLICEBUDDY_VECTOR_STORE", "numpy").lower()
@@ -0,0 +1,38 @@
+import re
+from typing import Dict, FrozenSet
+
+# Description keyword buckets read by the planning nodes. A keyword may belong to several buckets.
+KEYWORD_BUCKETS: Dict[str, tuple] = {
+    # generate_slicer_settings
+    "functional_infill": ("functional", "bracket", "mount", "holder", "clip", "tool", "hinge"),
+    "container": ("box", "container", "bin", "organizer", "tray"),
+    "decor_infill": ("figurine", "statue", "decor", "ornament", "model"),
+    "overhang": ("overhang", "bridge", "cantilever", "hanging"),
+    "functional": ("functional", "bracket", "mount", "holder", "clip"),
+    "decor": ("figurine", "statue", "decor", "ornament"),
+    # plan_orientation
+    "visible_face": ("logo", "text", "engrave", "face", "front"),
+    # select_material (checked in this order)
+    "flexible": ("tpu", "flex", "flexible", "rubber", "gasket", "seal", "phone case", "bumper"),
+    "outdoor": ("outdoor", "sun", "uv", "weather", "rain", "garden", "car", "roof"),
+    "heat": ("heat", "hot", "engine", "motor", "high temp", "kitchen", "dishwasher"),
+}
+
+_KEYWORD_TAGS: Dict[str, FrozenSet[str]] = {}
+for _tag, _words in KEYWORD_BUCKETS.items():
+    for _word in _words:
+        _KEYWORD_TAGS[_word] = _KEYWORD_TAGS.get(_word, frozenset()) | {_tag}
+
+# One pass over the description finds every keyword occurrence (the lookahead makes matches
+# overlap, so "toolbox" hits both "tool" and "box"). Longest-first keeps the alternation unambiguous.
+_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(k) for k in sorted(_KEYWORD_TAGS, key=len, reverse=True)) + "))"
+)
+
+
+def scan_tags(desc_lower: str) -> FrozenSet[str]:
+    """Set of bucket names whose keywords occur (as substrings) in a lowercased description."""
+    hits: FrozenSet[str] = frozenset()
+    for m in _KEYWORD_RE.finditer(desc_lower):
+        hits |= _KEYWORD_TAGS[m.group(1)]
+    return hits
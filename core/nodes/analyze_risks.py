@@ -1,5 +1,25 @@
-from typing import Any, Dict, List
-from core.state import PlanState
+from typing import Any, Dict, Final, List
+from core.config import CONTACT_AREA_LOW_MM2, CONTACT_RATIO_POINTY, TALL_ASPECT_RATIO, env_float
+from core.nodes.select_material import DEFAULT_MATERIAL
+from core.state import PlanState, norm_view
+
+SEVERITIES = ("low", "medium", "high")
+SEVERITY_RANK = {name: rank for rank, name in enumerate(SEVERITIES)}
+
+
+# Risk thresholds (tall / contact limits shared with the other nodes live in core.config).
+# Resolved once at import; override via env to tune without code changes.
+SMALL_FOOTPRINT_WIDTH_MM: Final[float] = env_float("SLICEBUDDY_SMALL_FOOTPRINT_MM", 20)   # no-STL fallback
+BRIM_MIN_LOW_CONTACT_MM: Final[float] = env_float("SLICEBUDDY_BRIM_MIN_LOW_CONTACT_MM", 6)
+BRIM_MIN_TALL_MM: Final[float] = env_float("SLICEBUDDY_BRIM_MIN_TALL_MM", 5)
+BRIM_MIN_SMALL_FOOTPRINT_MM: Final[float] = env_float("SLICEBUDDY_BRIM_MIN_SMALL_FOOTPRINT_MM", 5)
+WALLS_MIN_TALL: Final[int] = int(env_float("SLICEBUDDY_WALLS_MIN_TALL", 3))
+
+
+def _f(d: Dict[str, Any], key: str, default: float = 0.0) -> float:
+    """float(d[key]), treating missing/None/0/"" as `default`."""
+    v = d.get(key)
+    return float(v) if v else default
 
 
 def analyze_risks_node(state: PlanState) -> PlanState:
@@ -8,48 +28,63 @@ def analyze_risks_node(state: PlanState) -> PlanState:
     Uses STL signals when available (contact area/ratio, watertight, open-top heuristic, overhang heuristic).
     No loops, no auto-fixes: only warnings + mitigations + structured risk list.
     """
-    norm = state.get("input_norm", {})
-    material = (state.get("material", {}).get("recommended") or "PLA").upper()
+    view = norm_view(state)
+    material = state.get("material", {}).get("recommended") or DEFAULT_MATERIAL
     slicer = state.get("slicer_settings", {}).get("settings", {}) or {}
 
     warnings: List[str] = state.get("warnings", []) or []
     assumptions: List[str] = state.get("assumptions", []) or []
 
-    desc = (norm.get("description") or "").lower()
-    h = float(norm.get("height_mm", 0) or 0)
-    w = float(norm.get("width_mm", 0) or 0)
-    aspect = (h / w) if (h > 0 and w > 0) else 0.0
+    desc_has_overhang = "overhang" in view.tags
+    w, aspect = view.w, view.aspect
 
-    brim_mm = float(slicer.get("brim_mm", 0) or 0)
+    brim_mm = _f(slicer, "brim_mm")
     supports = str(slicer.get("supports", "")).lower()
-    walls = int(slicer.get("walls", 0) or 0)
+    supports_off = "off" in supports
+    walls = int(slicer.get("walls") or 0)
 
     # STL signals (optional)
     stl = state.get("stl_features") or {}
     used_stl = bool(stl)
 
-    contact_area = float(stl.get("contact_area_mm2", 0) or 0)
-    contact_ratio = float(stl.get("contact_ratio", 0) or 0)
+    # stl_features comes from core.stl.analyze_stl (see STLFeaturesDict): types are already right.
+    contact_area = stl.get("contact_area_mm2", 0.0)
+    contact_ratio = stl.get("contact_ratio", 0.0)
 
-    watertight = bool(stl.get("watertight", True)) if used_stl else True
-    is_volume = bool(stl.get("is_volume", True)) if used_stl else True
+    watertight = stl.get("watertight", True)
+    is_volume = stl.get("is_volume", True)
 
-    open_edges = int(stl.get("open_edges", 0) or 0)
-    likely_open_top = bool(stl.get("likely_open_top", False))
+    boundary_edges = stl.get("boundary_edges", 0)
+    nonmanifold_edges = stl.get("nonmanifold_edges", 0)
+    open_edges = stl.get("open_edges", boundary_edges + nonmanifold_edges)
+    likely_open_top = stl.get("likely_open_top", False)
 
-    likely_supports = bool(stl.get("likely_supports", False))
-    overhang_pct = float(stl.get("overhang_percent", 0) or 0)
-    max_overhang_deg = float(stl.get("max_overhang_deg", 0) or 0)
+    likely_supports = stl.get("likely_supports", False)
+    overhang_pct = stl.get("overhang_percent", 0.0)
+    max_overhang_deg = stl.get("max_overhang_deg", 0.0)
 
     risks: List[Dict[str, Any]] = []
     mitigations: List[str] = []
 
+    warnings_seen = set(warnings)
+
     def add_warning_once(msg: str):
-        if msg not in warnings:
+        if msg not in warnings_seen:
+            warnings_seen.add(msg)
             warnings.append(msg)
 
+    top_rank = [0]  # highest severity seen so far, as an index into SEVERITIES
+
+    assumptions_seen = set(assumptions)
+
+    def add_assumption_once(msg: str):
+        if msg not in assumptions_seen:
+            assumptions_seen.add(msg)
+            assumptions.append(msg)
+
     def add_risk(risk_id: str, severity: str, why: str, fix: str | None = None):
         risks.append({"id": risk_id, "severity": severity, "why": why})
+        top_rank[0] = max(top_rank[0], SEVERITY_RANK[severity])
         if fix:
             mitigations.append(fix)
 
@@ -58,13 +93,6 @@ def analyze_risks_node(state: PlanState) -> PlanState:
     # ------------------------------------------------------------
     # --- Mesh integrity risk ---
     if used_stl:
-        boundary_edges = int(stl.get("boundary_edges", 0) or 0)
-        nonmanifold_edges = int(stl.get("nonmanifold_edges", 0) or 0)
-        open_edges = int(stl.get("open_edges", boundary_edges + nonmanifold_edges) or 0)
-        likely_open_top = bool(stl.get("likely_open_top", False))
-        is_volume = bool(stl.get("is_volume", True))
-        watertight = bool(stl.get("watertight", True))
-
         if not watertight or open_edges > 0 or not is_volume:
             # Decide message flavor
             if likely_open_top and open_edges > 0:
@@ -88,7 +116,7 @@ def analyze_risks_node(state: PlanState) -> PlanState:
                 severity = "high"
 
             add_risk("mesh_not_watertight", severity, why, fix)
-            warnings.append("Mesh integrity issue detected. Consider repairing the STL before printing.")
+            add_warning_once("Mesh integrity issue detected. Consider repairing the STL before printing.")
 
     # If not a closed volume, volume-based estimates are unreliable
     if used_stl and not is_volume:
@@ -98,18 +126,18 @@ def analyze_risks_node(state: PlanState) -> PlanState:
     # 2) Adhesion risk (STL-based) — BEST SIGNALS
     # ------------------------------------------------------------
     # Small real contact area
-    if used_stl and contact_area > 0 and contact_area <= 500:
+    if used_stl and 0 < contact_area <= CONTACT_AREA_LOW_MM2:
         add_risk(
             "adhesion_low_contact",
             "high",
             f"Very small contact area with the bed (≈{round(contact_area, 1)} mm²). Detachment risk is high.",
             "Add brim/raft, slow first layer, clean bed, and consider re-orienting to increase contact area.",
         )
-        if brim_mm < 6:
+        if brim_mm < BRIM_MIN_LOW_CONTACT_MM:
             add_warning_once("Low contact area detected but brim is small/zero. Brim is strongly recommended.")
 
     # Pointy / edge contact (ratio)
-    if used_stl and contact_ratio > 0 and contact_ratio < 0.15:
+    if used_stl and 0 < contact_ratio < CONTACT_RATIO_POINTY:
         add_risk(
             "pointy_base_contact",
             "medium",
@@ -120,9 +148,9 @@ def analyze_risks_node(state: PlanState) -> PlanState:
     # ------------------------------------------------------------
     # 3) Stability risk (tall)
     # ------------------------------------------------------------
-    if aspect >= 3.0:
+    if aspect >= TALL_ASPECT_RATIO:
         severity = "medium"
-        if used_stl and contact_area > 0 and contact_area <= 500:
+        if used_stl and 0 < contact_area <= CONTACT_AREA_LOW_MM2:
             severity = "high"
 
         add_risk(
@@ -132,22 +160,22 @@ def analyze_risks_node(state: PlanState) -> PlanState:
             "Use brim (5–10mm), reduce speed, and ensure strong bed adhesion.",
         )
 
-        if brim_mm < 5:
+        if brim_mm < BRIM_MIN_TALL_MM:
             add_warning_once("Tall model detected but brim is small/zero. Consider adding a brim.")
-        if walls < 3:
+        if walls < WALLS_MIN_TALL:
             add_warning_once("Tall model detected but walls are low. Consider 3–4 walls.")
 
     # ------------------------------------------------------------
     # 4) Fallback adhesion risk when STL not available
     # ------------------------------------------------------------
-    if (not used_stl) and (0 < w <= 20):
+    if (not used_stl) and (0 < w <= SMALL_FOOTPRINT_WIDTH_MM):
         add_risk(
             "adhesion_small_footprint",
             "high",
             f"Small footprint (width≈{w}mm) can detach from bed easily.",
             "Add brim/mouse-ears, clean bed, and consider slower first layer.",
         )
-        if brim_mm < 5:
+        if brim_mm < BRIM_MIN_SMALL_FOOTPRINT_MM:
             add_warning_once("Small footprint detected but brim is small/zero. Brim is strongly recommended.")
 
     # ------------------------------------------------------------
@@ -162,19 +190,18 @@ def analyze_risks_node(state: PlanState) -> PlanState:
             "Enable supports (tree/organic if available) or re-orient to reduce overhangs.",
         )
         # If slicer is still 'auto', we don’t warn; if it’s off, we do.
-        if "off" in supports:
+        if supports_off:
             add_warning_once("STL overhang detected but supports are OFF. This may fail without supports.")
 
     # Text-based hint (backup)
-    if "off" in supports:
-        if any(k in desc for k in ["overhang", "bridge", "hanging", "cantilever"]):
-            add_risk(
-                "supports_maybe_needed",
-                "medium",
-                "Description suggests overhangs/bridges but supports are off.",
-                "Enable supports (tree/organic if available) or re-orient to reduce overhangs.",
-            )
-            add_warning_once("Overhang-related keywords detected. Supports might be needed.")
+    if supports_off and desc_has_overhang:
+        add_risk(
+            "supports_maybe_needed",
+            "medium",
+            "Description suggests overhangs/bridges but supports are off.",
+            "Enable supports (tree/organic if available) or re-orient to reduce overhangs.",
+        )
+        add_warning_once("Overhang-related keywords detected. Supports might be needed.")
 
     # ------------------------------------------------------------
     # 6) Material risks
@@ -186,8 +213,7 @@ def analyze_risks_node(state: PlanState) -> PlanState:
             f"{material} has higher warping risk without stable ambient temperature.",
             "Use an enclosure, avoid drafts, and use a brim. Consider ASA for outdoor UV needs.",
         )
-        if "Assuming enclosure/ventilation considerations for ABS/ASA." not in assumptions:
-            assumptions.append("Assuming enclosure/ventilation considerations for ABS/ASA.")
+        add_assumption_once("Assuming enclosure/ventilation considerations for ABS/ASA.")
 
     if material == "TPU":
         add_risk(
@@ -196,17 +222,13 @@ def analyze_risks_node(state: PlanState) -> PlanState:
             "TPU is flexible and can be harder to feed; stringing and jams are more likely.",
             "Print slowly, minimize retractions, and ensure filament path is constrained.",
         )
-        if "off" not in supports:
+        if not supports_off:
             add_warning_once("TPU selected: supports can be messy; avoid supports unless necessary.")
 
     # ------------------------------------------------------------
     # Summary severity
     # ------------------------------------------------------------
-    highest = "low"
-    if any(r["severity"] == "high" for r in risks):
-        highest = "high"
-    elif any(r["severity"] == "medium" for r in risks):
-        highest = "medium"
+    highest = SEVERITIES[top_rank[0]]
 
     state["risks"] = {
         "summary": {"count": len(risks), "highest_severity": highest},
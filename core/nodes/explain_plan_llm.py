@@ -1,51 +1,99 @@
-import json
+import math
 import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncIterator
+
+import orjson
+from jinja2 import Environment, Template
 from core.state import PlanState
 from core.prompts import load_prompt
-from langchain_openai import ChatOpenAI
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+_JINJA = Environment(trim_blocks=True, lstrip_blocks=True, autoescape=False)
+
+
+def _load_prompts() -> tuple[str, Template]:
+    return (
+        load_prompt("system/base_system.txt"),
+        _JINJA.from_string(load_prompt("templates/explain_plan.txt")),
+    )
+
+
+# Prompts are static at runtime: read (and compile) them once at import.
+# Set RELOAD_PROMPTS=true while editing prompt files to pick up changes per request.
+_SYSTEM_PROMPT, _EXPLAIN_TEMPLATE = _load_prompts()
+
+
+def _prompts() -> tuple[str, Template]:
+    if os.getenv("RELOAD_PROMPTS", "false").lower() in ("1", "true", "yes"):
+        load_prompt.cache_clear()  # load_prompt memoizes file reads
+        return _load_prompts()
+    return _SYSTEM_PROMPT, _EXPLAIN_TEMPLATE
+
+
+# (key, label, formatter) rows for the "Model Checks" section appended to the explanation.
+_BEGINNER_ROWS = (
+    ("bbox_mm", "Size (mm)", lambda v: f"{v[0]:.2f} × {v[1]:.2f} × {v[2]:.2f}"),
+    ("watertight", "Mesh health", lambda v: "OK" if v else "Needs repair (open mesh)"),
+    ("likely_supports", "Supports", lambda v: "Likely needed" if v else "Probably not needed"),
+    ("bed_contact", "Bed contact", str),
+)
+
+_TECH_ROWS = tuple(
+    (k, k, str)
+    for k in (
+        "bbox_mm", "watertight", "is_volume",
+        "contact_area_mm2", "contact_ratio",
+        "aspect_ratio", "overhang_percent", "max_overhang_deg",
+        "boundary_edges", "nonmanifold_edges", "degenerate_faces",
+        "open_edges", "likely_open_top",
+        "volume_mm3", "surface_area_mm2",
+        "mesh_issue",
+    )
+)
+
+
+def _present(v) -> bool:
+    """None and NaN (e.g. np.float64('nan') from a vectorized analyzer) both mean 'no value'."""
+    return v is not None and not (isinstance(v, float) and math.isnan(v))
+
+
+def _num(v) -> float:
+    return float(v) if v and _present(v) else 0.0
+
+
+def _bed_contact_label(stl: dict) -> str:
+    contact_area = _num(stl.get("contact_area_mm2"))
+    contact_ratio = _num(stl.get("contact_ratio"))
+
+    if contact_area <= 0:
+        return "Unknown"
+    if contact_area < 300 or contact_ratio < 0.15:
+        return "Very Low"
+    if contact_area < 600 or contact_ratio < 0.30:
+        return "Low"
+    return "Good"
+
+
+def _dumps_indent(obj) -> str:
+    """Pretty JSON for the prompt (orjson: 2-space indent, UTF-8, no ASCII escaping)."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+def _render_rows(title: str, rows: tuple, values: dict) -> str:
+    return "\n".join((title, *(f"- **{label}**: {fmt(values[k])}" for k, label, fmt in rows if _present(values.get(k)))))
 
 
 def _render_model_checks_beginner(state: PlanState) -> str:
     """
-    Beginner-friendly checks only:
-    - dimensions
-    - watertight status (simple)
-    - supports likely (simple)
-    - bed contact label (simple)
+    Beginner-friendly checks only: dimensions, mesh health, supports, bed contact label.
     """
     stl = state.get("stl_features") or {}
     if not stl:
         return ""
-
-    bbox = stl.get("bbox_mm")
-    watertight = stl.get("watertight")
-    likely_supports = stl.get("likely_supports")
-
-    contact_area = float(stl.get("contact_area_mm2") or 0)
-    contact_ratio = float(stl.get("contact_ratio") or 0)
-
-    # Simple bed-contact label
-    if contact_area <= 0:
-        contact_label = "Unknown"
-    elif contact_area < 300 or contact_ratio < 0.15:
-        contact_label = "Very Low"
-    elif contact_area < 600 or contact_ratio < 0.30:
-        contact_label = "Low"
-    else:
-        contact_label = "Good"
-
-    lines = []
-    lines.append("\n### Model Checks")
-    if bbox:
-        x, y, z = bbox
-        lines.append(f"- **Size (mm)**: {x:.2f} × {y:.2f} × {z:.2f}")
-    if watertight is not None:
-        lines.append(f"- **Mesh health**: {'OK' if watertight else 'Needs repair (open mesh)'}")
-    if likely_supports is not None:
-        lines.append(f"- **Supports**: {'Likely needed' if likely_supports else 'Probably not needed'}")
-    lines.append(f"- **Bed contact**: {contact_label}")
-
-    return "\n".join(lines)
+    return _render_rows("\n### Model Checks", _BEGINNER_ROWS, {**stl, "bed_contact": _bed_contact_label(stl)})
 
 
 def _render_model_checks_tech(state: PlanState) -> str:
@@ -55,58 +103,107 @@ def _render_model_checks_tech(state: PlanState) -> str:
     stl = state.get("stl_features") or {}
     if not stl:
         return ""
+    return _render_rows("\n### Model Checks (technical)", _TECH_ROWS, stl)
 
-    lines = []
-    lines.append("\n### Model Checks (technical)")
-    for k in [
-        "bbox_mm", "watertight", "is_volume",
-        "contact_area_mm2", "contact_ratio",
-        "aspect_ratio", "overhang_percent", "max_overhang_deg",
-        "boundary_edges", "nonmanifold_edges", "degenerate_faces",
-        "open_edges", "likely_open_top",
-        "volume_mm3", "surface_area_mm2",
-        "mesh_issue",
-    ]:
-        if k in stl:
-            lines.append(f"- **{k}**: {stl.get(k)}")
-    return "\n".join(lines)
 
+# Model Checks appended after the LLM text. SHOW_TECH_DETAILS=true adds the full technical dump.
+# Resolved once at import rather than per request.
+MODEL_CHECK_RENDERERS = (_render_model_checks_beginner,)
+if os.getenv("SHOW_TECH_DETAILS", "false").lower() in ("1", "true", "yes"):
+    MODEL_CHECK_RENDERERS += (_render_model_checks_tech,)
 
-def explain_plan_llm_node(state: PlanState) -> PlanState:
-    system_prompt = load_prompt("system/base_system.txt")
-    template = load_prompt("templates/explain_plan.txt")
 
-    plan = state.get("plan", {}) or {}
-    plan_json = json.dumps(plan, ensure_ascii=False, indent=2)
+LLM_MODEL = "gpt-4o-mini"
+LLM_TEMPERATURE = 0.2
+
+
+@lru_cache(maxsize=1)
+def _get_llm() -> "ChatOpenAI":
+    """
+    One shared client per process so the underlying HTTP connection pool is reused.
+    Built on first use (not at import) so the non-LLM workflow still works without OPENAI_API_KEY,
+    and so importing the workflow doesn't pay for langchain_openai (httpx, tiktoken, openai SDK).
+    """
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model=LLM_MODEL, temperature=LLM_TEMPERATURE)
+
+
+def _messages(system_prompt: str, user_prompt: str) -> list[dict]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
 
-    warnings = state.get("warnings", []) or []
-    risks = state.get("risks", {}) or {}
 
-    user_prompt = template.format(
+def _call_llm(system_prompt: str, user_prompt: str, temperature: float = LLM_TEMPERATURE) -> str:
+    llm = _get_llm()
+    if temperature != LLM_TEMPERATURE:
+        llm = llm.bind(temperature=temperature)
+    resp = llm.invoke(_messages(system_prompt, user_prompt))
+    return (resp.content or "").strip()
+
+
+def _build_prompts(state: PlanState) -> tuple[str, str]:
+    """Return (system_prompt, user_prompt) for the plan explanation."""
+    system_prompt, template = _prompts()
+
+    plan = state.get("plan", {}) or {}
+    # Risks are rendered as a bullet list by the template; don't send them twice as JSON.
+    plan_json = _dumps_indent({k: v for k, v in plan.items() if k != "risks"})
+
+    user_prompt = template.render(
         plan_json=plan_json,
-        warnings_text="\n".join(f"- {w}" for w in warnings) if warnings else "- (none)",
-        risks_json=json.dumps(risks, ensure_ascii=False, indent=2),
+        warnings=state.get("warnings", []) or [],
+        risks=state.get("risks", {}) or {},
         rag_context=state.get("rag_context", "") or "",
     )
+    return system_prompt, user_prompt
 
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
 
-    resp = llm.invoke(
-        [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-    )
+def _render_model_checks(state: PlanState) -> str:
+    return "".join(render(state) for render in MODEL_CHECK_RENDERERS)
 
-    explanation = (resp.content or "").strip()
 
-    # ✅ append beginner-friendly checks
-    explanation += _render_model_checks_beginner(state)
+def _skip_llm(state: PlanState) -> bool:
+    """
+    Nothing worth explaining: the guard stopped the run. Keep the guard's message
+    (or fall back to the deterministic checks) instead of paying for an LLM call.
+    """
+    if not state.get("stop"):
+        return False
+    if not state.get("plan_explanation"):
+        state["plan_explanation"] = _render_model_checks(state).lstrip("\n")
+    return True
 
-    # ✅ optional technical dump
-    show_tech = os.getenv("SHOW_TECH_DETAILS", "false").lower() in ("1", "true", "yes")
-    if show_tech:
-        explanation += _render_model_checks_tech(state)
+
+def explain_plan_llm_node(state: PlanState) -> PlanState:
+    if _skip_llm(state):
+        return state
+
+    explanation = _call_llm(*_build_prompts(state))
+    explanation += _render_model_checks(state)
 
     state["plan_explanation"] = explanation
-    return state
\ No newline at end of file
+    return state
+
+
+def fallback_explanation(state: PlanState) -> str:
+    """The deterministic part of the explanation (Model Checks), for when the LLM call fails."""
+    return _render_model_checks(state)
+
+
+async def explain_plan_llm_stream(state: PlanState) -> AsyncIterator[str]:
+    """
+    Streaming variant of explain_plan_llm_node for /plan/stream.
+    Yields LLM text chunks as they arrive, then the deterministic Model Checks section.
+    Expects a state that already went through the planning graph (plan, risks, rag_context).
+    """
+    if _skip_llm(state):
+        yield state["plan_explanation"]
+        return
+
+    async for chunk in _get_llm().astream(_messages(*_build_prompts(state))):
+        if chunk.content:
+            yield chunk.content
+    yield _render_model_checks(state)
@@ -1,5 +1,191 @@
-from typing import Any, Dict, List
-from core.state import PlanState
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List
+from core.config import CONTACT_AREA_LOW_MM2, CONTACT_RATIO_POINTY, TALL_ASPECT_RATIO
+from core.nodes.select_material import DEFAULT_MATERIAL
+from core.state import PlanState, norm_view
+
+
+@dataclass(slots=True, frozen=True)
+class MaterialRule:
+    """Per-material overrides of the base slicer settings, plus the notes/diagnostics they imply."""
+    overrides: Dict[str, Any] = field(default_factory=dict)
+    note: str = ""
+    warning: str | None = None
+    assumption: str | None = None
+
+    def apply(self, settings: Dict[str, Any], notes: List[str], warnings: List[str], assumptions: List[str]) -> None:
+        settings.update(self.overrides)
+        notes.append(self.note)
+        if self.warning:
+            warnings.append(self.warning)
+        if self.assumption:
+            assumptions.append(self.assumption)
+
+
+_ABS_ASA_RULE = MaterialRule(
+    overrides={"walls": 4, "top_bottom_layers": 5, "infill_percent": 20, "brim_mm": 6},
+    note="ABS/ASA: brim helps; enclosure recommended.",
+    warning="ABS/ASA warping risk: consider enclosure and stable ambient temperature.",
+)
+
+# --- Material adjustments (materials not listed keep the base defaults) ---
+MATERIAL_RULES: Dict[str, MaterialRule] = {
+    "PLA": MaterialRule(note="PLA: easy printing; good for prototypes/decor."),
+    "PETG": MaterialRule(
+        overrides={"top_bottom_layers": 5, "infill_percent": 18},
+        note="PETG: tougher than PLA; watch stringing.",
+        assumption="Assuming PETG benefits from extra top/bottom for stiffness.",
+    ),
+    "ABS": _ABS_ASA_RULE,
+    "ASA": _ABS_ASA_RULE,
+    "TPU": MaterialRule(
+        overrides={
+            "layer_height_mm": 0.24,
+            "walls": 2,
+            "top_bottom_layers": 4,
+            "infill_percent": 12,
+            "supports": "off unless absolutely necessary",
+        },
+        note="TPU: print slowly; avoid aggressive retraction.",
+        assumption="Assuming TPU printed slowly with conservative retraction settings.",
+    ),
+}
+
+
+# --- Rule conditions as bit flags (computed once per call by _rule_flags) ---
+FUNC_INFILL_KW = 1 << 0
+CONTAINER_KW = 1 << 1
+DECOR_INFILL_KW = 1 << 2
+TALL = 1 << 3
+STL_SUPPORTS = 1 << 4
+OVERHANG_KW = 1 << 5
+SMALL_CONTACT = 1 << 6
+POINTY = 1 << 7
+FUNC_KW = 1 << 8
+DECOR_KW = 1 << 9
+
+_KEYWORD_FLAGS = {
+    "functional_infill": FUNC_INFILL_KW,
+    "container": CONTAINER_KW,
+    "decor_infill": DECOR_INFILL_KW,
+    "overhang": OVERHANG_KW,
+    "functional": FUNC_KW,
+    "decor": DECOR_KW,
+}
+
+
+def _rule_flags(
+    hits: FrozenSet[str],
+    aspect: float,
+    used_stl: bool,
+    likely_supports: bool,
+    contact_area: float,
+    contact_ratio: float,
+) -> int:
+    flags = 0
+    for tag in hits:
+        flags |= _KEYWORD_FLAGS.get(tag, 0)
+    if aspect >= TALL_ASPECT_RATIO:
+        flags |= TALL
+    if used_stl and likely_supports:
+        flags |= STL_SUPPORTS
+    if used_stl and 0 < contact_area <= CONTACT_AREA_LOW_MM2:
+        flags |= SMALL_CONTACT
+    if used_stl and 0 < contact_ratio < CONTACT_RATIO_POINTY:
+        flags |= POINTY
+    return flags
+
+
+# --- Infill pattern selection (beginner-friendly) ---
+def _infill_functional(settings: Dict[str, Any], notes: List[str], warnings: List[str]) -> None:
+    # Functional / load parts
+    settings["infill_pattern"] = "gyroid"
+    settings["infill_reason"] = "Balanced strength in all directions for functional parts."
+
+
+def _infill_container(settings: Dict[str, Any], notes: List[str], warnings: List[str]) -> None:
+    # Boxes / containers / organizers: fast, stable, clean walls
+    settings["infill_pattern"] = "grid"
+    settings["infill_reason"] = "Fast, predictable, and plenty strong for simple containers."
+
+
+def _infill_decor(settings: Dict[str, Any], notes: List[str], warnings: List[str]) -> None:
+    # Decorative / figurines: smooth + consistent, not overkill
+    settings["infill_pattern"] = "gyroid"
+    settings["infill_reason"] = "Keeps strength consistent without needing high infill."
+
+
+def _infill_tall(settings: Dict[str, Any], notes: List[str], warnings: List[str]) -> None:
+    # Tall skinny things: avoid wobble → use something stable
+    settings["infill_pattern"] = "gyroid"
+    settings["infill_reason"] = "More uniform internal support can help tall parts behave better."
+
+
+# --- Stability adjustments (dimension-based fallback) ---
+def _stability_tall(settings: Dict[str, Any], notes: List[str], warnings: List[str]) -> None:
+    settings["brim_mm"] = max(settings["brim_mm"], 6)
+    settings["walls"] = max(settings["walls"], 4)
+    notes.append("Tall model: increased walls + brim for stability.")
+    warnings.append("Tall aspect ratio: consider slowing down and using a brim.")
+
+
+# --- STL-based support detection (REAL geometry) ---
+def _supports_stl(settings: Dict[str, Any], notes: List[str], warnings: List[str]) -> None:
+    # If the STL analyzer says supports likely needed, reflect that.
+    settings["supports"] = "on (STL overhang detected)"
+    warnings.append("STL overhang detected. Supports likely needed.")
+
+
+# --- Keyword-based support hints (user text) ---
+def _supports_keywords(settings: Dict[str, Any], notes: List[str], warnings: List[str]) -> None:
+    # If the user explicitly says overhang/cantilever/bridge, we force supports on.
+    settings["supports"] = "on (overhang hints detected)"
+    notes.append("Overhang-related keywords: supports likely needed unless re-oriented.")
+    warnings.append("Overhang hints detected. Supports may be needed.")
+
+
+# --- STL-based adhesion tweaks (contact area > bbox-based) ---
+def _adhesion_small_contact(settings: Dict[str, Any], notes: List[str], warnings: List[str]) -> None:
+    # Very small real contact area (diamond tip case)
+    settings["brim_mm"] = max(settings["brim_mm"], 8)
+    notes.append("Very small bed contact: brim strongly recommended.")
+    warnings.append("Very small bed contact area detected. High adhesion failure risk.")
+
+
+def _adhesion_pointy(settings: Dict[str, Any], notes: List[str], warnings: List[str]) -> None:
+    # Pointy base signal (low contact_ratio)
+    settings["brim_mm"] = max(settings["brim_mm"], 10)
+    notes.append("Pointy base contact: consider re-orienting or adding raft/brim.")
+    warnings.append("Pointy base contact detected. Consider changing orientation or adding a raft/brim.")
+
+
+# --- Strength hints ---
+def _strength_functional(settings: Dict[str, Any], notes: List[str], warnings: List[str]) -> None:
+    settings["walls"] = max(settings["walls"], 4)
+    settings["infill_percent"] = max(settings["infill_percent"], 20)
+    notes.append("Functional part: increased walls/infill for strength.")
+
+
+def _strength_decor(settings: Dict[str, Any], notes: List[str], warnings: List[str]) -> None:
+    settings["infill_percent"] = min(settings["infill_percent"], 12)
+    notes.append("Decorative part: lower infill usually fine.")
+
+
+# (mask, required, apply): a rule fires when flags & mask == required. Order matters:
+# later rules override earlier ones. The infill keyword rules mask out the earlier buckets (if/elif).
+RULES = (
+    (FUNC_INFILL_KW, FUNC_INFILL_KW, _infill_functional),
+    (FUNC_INFILL_KW | CONTAINER_KW, CONTAINER_KW, _infill_container),
+    (FUNC_INFILL_KW | CONTAINER_KW | DECOR_INFILL_KW, DECOR_INFILL_KW, _infill_decor),
+    (TALL, TALL, _infill_tall),
+    (TALL, TALL, _stability_tall),
+    (STL_SUPPORTS, STL_SUPPORTS, _supports_stl),
+    (OVERHANG_KW, OVERHANG_KW, _supports_keywords),
+    (SMALL_CONTACT, SMALL_CONTACT, _adhesion_small_contact),
+    (POINTY, POINTY, _adhesion_pointy),
+    (FUNC_KW, FUNC_KW, _strength_functional),
+    (DECOR_KW, DECOR_KW, _strength_decor),
+)
 
 
 def generate_slicer_settings_node(state: PlanState) -> PlanState:
@@ -12,15 +198,12 @@ def generate_slicer_settings_node(state: PlanState) -> PlanState:
     - Mesh integrity warnings are handled in analyze_risks_node (single source of truth).
     - This node focuses on slicer knobs (supports, brim, walls, etc).
     """
-    norm = state.get("input_norm", {})
+    view = norm_view(state)
     material_info = state.get("material", {})
-    warnings: List[str] = state.get("warnings", [])
-    assumptions: List[str] = state.get("assumptions", [])
+    warnings: List[str] = state.setdefault("warnings", [])
+    assumptions: List[str] = state.setdefault("assumptions", [])
 
-    desc = (norm.get("description") or "").lower()
-    h = float(norm.get("height_mm", 0) or 0)
-    w = float(norm.get("width_mm", 0) or 0)
-    aspect = (h / w) if (h > 0 and w > 0) else 0.0
+    h, w, aspect = view.h, view.w, view.aspect
 
     # --- STL signals (optional) ---
     stl = state.get("stl_features") or {}
@@ -30,7 +213,7 @@ def generate_slicer_settings_node(state: PlanState) -> PlanState:
     contact_ratio = float(stl.get("contact_ratio", 0) or 0) if used_stl else 0.0
     watertight = bool(stl.get("watertight", True)) if used_stl else None
 
-    mat = (material_info.get("recommended") or "PLA").upper()
+    mat = material_info.get("recommended") or DEFAULT_MATERIAL
 
     # Base defaults (general purpose)
     settings: Dict[str, Any] = {
@@ -42,103 +225,25 @@ def generate_slicer_settings_node(state: PlanState) -> PlanState:
         "infill_reason": "Good all-around strength and supports top layers well without harsh direction bias.",
         "supports": "off (unknown geometry)",
         "brim_mm": 0,
-        "notes": [],
     }
+    notes: List[str] = []  # attached as settings["notes"] (last key) once all rules ran
 
-    # --- Material adjustments ---
-    if mat == "PLA":
-        settings["notes"].append("PLA: easy printing; good for prototypes/decor.")
-    elif mat == "PETG":
-        settings["top_bottom_layers"] = 5
-        settings["infill_percent"] = 18
-        settings["notes"].append("PETG: tougher than PLA; watch stringing.")
-        assumptions.append("Assuming PETG benefits from extra top/bottom for stiffness.")
-    elif mat in ("ABS", "ASA"):
-        settings["walls"] = 4
-        settings["top_bottom_layers"] = 5
-        settings["infill_percent"] = 20
-        settings["brim_mm"] = 6
-        settings["notes"].append("ABS/ASA: brim helps; enclosure recommended.")
-        warnings.append("ABS/ASA warping risk: consider enclosure and stable ambient temperature.")
-    elif mat == "TPU":
-        settings["layer_height_mm"] = 0.24
-        settings["walls"] = 2
-        settings["top_bottom_layers"] = 4
-        settings["infill_percent"] = 12
-        settings["supports"] = "off unless absolutely necessary"
-        settings["notes"].append("TPU: print slowly; avoid aggressive retraction.")
-        assumptions.append("Assuming TPU printed slowly with conservative retraction settings.")
-
-    # --- Infill pattern selection (beginner-friendly) ---
-    # Functional / load parts
-    if any(k in desc for k in ["functional", "bracket", "mount", "holder", "clip", "tool", "hinge"]):
-        settings["infill_pattern"] = "gyroid"
-        settings["infill_reason"] = "Balanced strength in all directions for functional parts."
+    material_rule = MATERIAL_RULES.get(mat)
+    if material_rule:
+        material_rule.apply(settings, notes, warnings, assumptions)
 
-    # Boxes / containers / organizers: fast, stable, clean walls
-    elif any(k in desc for k in ["box", "container", "bin", "organizer", "tray"]):
-        settings["infill_pattern"] = "grid"
-        settings["infill_reason"] = "Fast, predictable, and plenty strong for simple containers."
-
-    # Decorative / figurines: smooth + consistent, not overkill
-    elif any(k in desc for k in ["figurine", "statue", "decor", "ornament", "model"]):
-        settings["infill_pattern"] = "gyroid"
-        settings["infill_reason"] = "Keeps strength consistent without needing high infill."
-
-    # Tall skinny things: avoid wobble → use something stable
-    if aspect >= 3.0:
-        settings["infill_pattern"] = "gyroid"
-        settings["infill_reason"] = "More uniform internal support can help tall parts behave better."
-
-    # --- Stability adjustments (dimension-based fallback) ---
-    if aspect >= 3.0:
-        settings["brim_mm"] = max(settings["brim_mm"], 6)
-        settings["walls"] = max(settings["walls"], 4)
-        settings["notes"].append("Tall model: increased walls + brim for stability.")
-        warnings.append("Tall aspect ratio: consider slowing down and using a brim.")
-
-    # --- STL-based support detection (REAL geometry) ---
-    # If the STL analyzer says supports likely needed, reflect that.
-    if used_stl and likely_supports:
-        settings["supports"] = "on (STL overhang detected)"
-        warnings.append("STL overhang detected. Supports likely needed.")
-
-    # --- Keyword-based support hints (user text) ---
-    # If the user explicitly says overhang/cantilever/bridge, we force supports on.
-    if any(k in desc for k in ["overhang", "bridge", "cantilever", "hanging"]):
-        settings["supports"] = "on (overhang hints detected)"
-        settings["notes"].append("Overhang-related keywords: supports likely needed unless re-oriented.")
-        warnings.append("Overhang hints detected. Supports may be needed.")
-
-    # --- STL-based adhesion tweaks (contact area > bbox-based) ---
-    # 1) Very small real contact area (diamond tip case)
-    if used_stl and 0 < contact_area <= 500:
-        settings["brim_mm"] = max(settings["brim_mm"], 8)
-        settings["notes"].append("Very small bed contact: brim strongly recommended.")
-        warnings.append("Very small bed contact area detected. High adhesion failure risk.")
-
-    # 2) Pointy base signal (low contact_ratio)
-    if used_stl and 0 < contact_ratio < 0.15:
-        settings["brim_mm"] = max(settings["brim_mm"], 10)
-        settings["notes"].append("Pointy base contact: consider re-orienting or adding raft/brim.")
-        warnings.append("Pointy base contact detected. Consider changing orientation or adding a raft/brim.")
-
-    # --- Strength hints ---
-    if any(k in desc for k in ["functional", "bracket", "mount", "holder", "clip"]):
-        settings["walls"] = max(settings["walls"], 4)
-        settings["infill_percent"] = max(settings["infill_percent"], 20)
-        settings["notes"].append("Functional part: increased walls/infill for strength.")
-
-    if any(k in desc for k in ["figurine", "statue", "decor", "ornament"]):
-        settings["infill_percent"] = min(settings["infill_percent"], 12)
-        settings["notes"].append("Decorative part: lower infill usually fine.")
+    flags = _rule_flags(view.tags, aspect, used_stl, likely_supports, contact_area, contact_ratio)
+    for mask, required, apply in RULES:
+        if flags & mask == required:
+            apply(settings, notes, warnings)
+    settings["notes"] = notes
 
     state["slicer_settings"] = {
         "material": mat,
         "settings": settings,
         "signals": {
-            "height_mm": round(h, 2),
-            "width_mm": round(w, 2),
+            "height_mm": h,  # already rounded by normalize_input
+            "width_mm": w,
             "aspect_ratio": round(aspect, 2),
             "used_stl": used_stl,
             "contact_area_mm2": round(contact_area, 2) if used_stl else None,
@@ -148,6 +253,4 @@ def generate_slicer_settings_node(state: PlanState) -> PlanState:
         },
     }
 
-    state["warnings"] = warnings
-    state["assumptions"] = assumptions
     return state
\ No newline at end of file
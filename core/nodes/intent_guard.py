@@ -1,4 +1,8 @@
 import re
+from functools import lru_cache
+
+import numpy as np
+
 from core.state import PlanState
 
 # tiny list, enough to catch junk without being language-police
@@ -8,35 +12,74 @@ COMMON_WORDS = {
     "screw", "container", "organizer", "shelf", "phone", "camera", "wall", "desk"
 }
 
+_WORD_RE = re.compile(r"[a-z]{2,}")  # input is lowercased first
+# A COMMON_WORDS entry appearing as a whole _WORD_RE token (not inside a longer letter run).
+COMMON_WORDS_RE = re.compile(
+    r"(?<![a-z])(?:" + "|".join(sorted(COMMON_WORDS, key=len, reverse=True)) + r")(?![a-z])"
+)
+
+# str.translate deletion tables: len(s) - len(s.translate(tbl)) counts the deleted chars in C.
+_DROP_ASCII_LETTERS = str.maketrans("", "", "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
+_DROP_VOWELS = str.maketrans("", "", "aeiou")
+
+
+# Byte lookup tables for long ASCII inputs: one numpy gather + sum instead of building a translated copy.
+_LUT_MIN_LEN = 64
+_LETTER_LUT = np.zeros(256, np.uint8)
+_LETTER_LUT[ord("a"):ord("z") + 1] = 1
+_LETTER_LUT[ord("A"):ord("Z") + 1] = 1
+_VOWEL_LUT = np.zeros(256, np.uint8)
+_VOWEL_LUT[np.frombuffer(b"aeiou", np.uint8)] = 1
+
+
+def _lut_count(s: str, lut: np.ndarray) -> int:
+    return int(lut[np.frombuffer(s.encode("ascii"), np.uint8)].sum(dtype=np.int64))
+
+
+def _count_letters(s: str) -> int:
+    if s.isascii():
+        if len(s) > _LUT_MIN_LEN:
+            return _lut_count(s, _LETTER_LUT)
+        return len(s) - len(s.translate(_DROP_ASCII_LETTERS))
+    return sum(ch.isalpha() for ch in s)
+
+
+def _count_vowels(s: str) -> int:
+    """s is ASCII (joined regex words)."""
+    if len(s) > _LUT_MIN_LEN:
+        return _lut_count(s, _VOWEL_LUT)
+    return len(s) - len(s.translate(_DROP_VOWELS))
+
+
 def _looks_like_gibberish(text: str) -> bool:
     s = text.strip().lower()
     if len(s) < 6:
         return True  # too short to be meaningful in your UI
 
     # must contain at least some letters
-    letters = sum(ch.isalpha() for ch in s)
-    if letters / max(len(s), 1) < 0.5:
+    if _count_letters(s) / max(len(s), 1) < 0.5:
         return True
 
-    # tokenize words
-    words = re.findall(r"[a-zA-Z]{2,}", s)
+    # a known keyword like "bracket" / "holder" makes it a real description (the usual case)
+    if COMMON_WORDS_RE.search(s):
+        return False
+
+    # tokenize words; a single unknown word isn't enough
+    # (this also rejects single-char runs like "aaaaaa"; non-letter runs fail the ratio check above)
+    words = _WORD_RE.findall(s)
     if len(words) < 2:
-        # allow 1-word only if it's a common known keyword like "bracket" / "holder"
-        return not any(w in COMMON_WORDS for w in words)
+        return True
 
     # block obvious keyboard mash (very low vowel ratio)
     joined = "".join(words)
-    vowels = sum(ch in "aeiou" for ch in joined)
-    if vowels / max(len(joined), 1) < 0.20:
-        # BUT don't punish real words that include a known keyword
-        if not any(w in COMMON_WORDS for w in words):
-            return True
-
-    # block extreme repetition like "aaaaaa" / "qweqweqwe"
-    if re.fullmatch(r"(.)\1{5,}", s):
-        return True
+    vowels = _count_vowels(joined)
+    return vowels / max(len(joined), 1) < 0.20
+
 
-    return False
+@lru_cache(maxsize=4096)
+def _desc_ok(desc: str) -> bool:
+    """Meaning check on the (stripped) description. Pure, so repeated descriptions hit the cache."""
+    return len(desc) >= 6 and not _looks_like_gibberish(desc)
 
 
 def intent_guard_node(state: PlanState) -> PlanState:
@@ -49,7 +92,7 @@ def intent_guard_node(state: PlanState) -> PlanState:
     dims_ok = isinstance(h, (int, float)) and isinstance(w, (int, float)) and h > 0 and w > 0
 
     # NEW: Meaning check (especially when STL exists)
-    desc_ok = len(desc) >= 6 and not _looks_like_gibberish(desc)
+    desc_ok = _desc_ok(desc)
 
     is_plan_request = desc_ok and (dims_ok or has_stl)
     state["stop"] = not is_plan_request
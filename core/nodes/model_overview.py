@@ -1,5 +1,23 @@
+import re
+
 from core.state import PlanState
 
+# (keywords, category) in priority order; first bucket with a substring hit wins.
+CATEGORY_KEYWORDS = (
+    (("box", "container", "bin", "tray", "organizer", "case"), "a small container / organizer"),
+    (("stand", "holder", "dock", "mount", "bracket"), "a holder / mount type part"),
+    (("toy", "figurine", "statue", "model"), "a decorative model"),
+    (("clip", "hook", "hanger"), "a clip / hook style part"),
+)
+
+# One compiled alternation per bucket: a single regex scan instead of one `in` scan per keyword.
+_CATEGORY_PATTERNS = tuple(
+    (re.compile("|".join(map(re.escape, keywords))), label) for keywords, label in CATEGORY_KEYWORDS
+)
+
+
+OVERVIEW_TEMPLATE = "Looks like {category}. Shape check: {shape}, {bed}, {supports}. Model health: {mesh}."
+
 
 def model_overview_node(state: PlanState) -> PlanState:
     """
@@ -47,25 +65,18 @@ def model_overview_node(state: PlanState) -> PlanState:
 
     # --- Guess category from description keywords (WITHOUT repeating the sentence) ---
     # We try to infer a category and add "maybe"
-    category = None
-    if any(k in desc for k in ["box", "container", "bin", "tray", "organizer", "case"]):
-        category = "a small container / organizer"
-    elif any(k in desc for k in ["stand", "holder", "dock", "mount", "bracket"]):
-        category = "a holder / mount type part"
-    elif any(k in desc for k in ["toy", "figurine", "statue", "model"]):
-        category = "a decorative model"
-    elif any(k in desc for k in ["clip", "hook", "hanger"]):
-        category = "a clip / hook style part"
-
     # If we couldn’t categorize, keep it neutral but still helpful
-    if not category:
-        category = "a general-purpose print"
+    category = next(
+        (label for pattern, label in _CATEGORY_PATTERNS if pattern.search(desc)),
+        "a general-purpose print",
+    )
 
     # --- Build overview (don’t echo the user text) ---
-    lines = []
-    lines.append(f"Looks like {category}.")
-    lines.append(f"Shape check: {'tall & skinny' if tall_skinny else 'normal proportions'}, {bed_contact}, {supports_vibe}.")
-    lines.append(f"Model health: {mesh_vibe}.")
-
-    state["model_overview"] = " ".join(lines)
+    state["model_overview"] = OVERVIEW_TEMPLATE.format_map({
+        "category": category,
+        "shape": "tall & skinny" if tall_skinny else "normal proportions",
+        "bed": bed_contact,
+        "supports": supports_vibe,
+        "mesh": mesh_vibe,
+    })
     return state
\ No newline at end of file
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List
-from core.state import PlanState
+from core.keywords import scan_tags
+from core.state import NormView, PlanState
 
 
 def normalize_input_node(state: PlanState) -> PlanState:
@@ -11,11 +12,12 @@ def normalize_input_node(state: PlanState) -> PlanState:
     Writes:
       - state["input_raw"]   : snapshot of what we received
       - state["input_norm"]  : cleaned values the workflow should use
+      - state["input_norm_view"] : NormView (lowercased description, h, w, aspect, keyword tags) for downstream nodes
       - state["assumptions"] : human-readable assumptions
       - state["warnings"]    : human-readable warnings
     """
-    assumptions: List[str] = state.get("assumptions", [])
-    warnings: List[str] = state.get("warnings", [])
+    assumptions: List[str] = state.setdefault("assumptions", [])
+    warnings: List[str] = state.setdefault("warnings", [])
 
     # Snapshot the raw input (useful for debugging & presentation)
     input_raw: Dict[str, Any] = {
@@ -66,22 +68,31 @@ def normalize_input_node(state: PlanState) -> PlanState:
         warnings.append(
             "Width is over ~250mm. Make sure your printer's bed size can handle it."
         )
-    if h > 0 and w > 0:
-        aspect = h / w if w != 0 else 0
-        if aspect >= 4:
-            warnings.append(
-                "Model looks tall vs. wide (high aspect ratio). Stability risk; consider brim/supports."
-            )
+    # Values the rest of the workflow uses; aspect is derived from them once, here.
+    h, w = round(h, 2), round(w, 2)
+    aspect = (h / w) if (h > 0 and w > 0) else 0.0
+
+    if aspect >= 4:
+        warnings.append(
+            "Model looks tall vs. wide (high aspect ratio). Stability risk; consider brim/supports."
+        )
 
     input_norm: Dict[str, Any] = {
         "description": desc,
-        "height_mm": round(h, 2),
-        "width_mm": round(w, 2),
+        "height_mm": h,
+        "width_mm": w,
+        "aspect_ratio": round(aspect, 2),
     }
 
     state["input_raw"] = input_raw
     state["input_norm"] = input_norm
-    state["assumptions"] = assumptions
-    state["warnings"] = warnings
+    desc_lower = desc.lower()
+    state["input_norm_view"] = NormView(
+        desc_lower=desc_lower,
+        h=h,
+        w=w,
+        aspect=aspect,
+        tags=scan_tags(desc_lower),  # one keyword pass for all downstream nodes
+    )
 
     return state
\ No newline at end of file
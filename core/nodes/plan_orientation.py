@@ -1,5 +1,57 @@
-from typing import Any, Dict, List
-from core.state import PlanState
+from typing import Any, Dict, Final, FrozenSet, List
+from core.config import TALL_ASPECT_RATIO, env_float
+from core.state import PlanState, norm_view
+
+# Bounding-box footprint (x * y) at or below which the part counts as a small footprint (~22mm x 22mm).
+# Not the measured bed contact area (core.config.CONTACT_AREA_LOW_MM2): tuned separately.
+SMALL_FOOTPRINT_MM2: Final[float] = env_float("SLICEBUDDY_SMALL_FOOTPRINT_MM2", 500)
+
+# --- Rule conditions as bit flags (computed once per call by _orientation_flags) ---
+TALL = 1 << 0
+SMALL_FOOTPRINT = 1 << 1
+VISIBLE_FACE = 1 << 2
+
+# (recommended, reason, tradeoffs)
+_DEFAULT_PROFILE = (
+    "Lay flat on the largest face",
+    "Maximizes bed contact and reduces the chance of tipping.",
+    (
+        "May change which surfaces look best (aesthetic trade-off).",
+        "May increase support needs depending on overhangs.",
+    ),
+)
+_TALL_PROFILE = (
+    "Lay flat (prioritize the widest footprint)",
+    "Tall geometry (high aspect ratio) suggests instability if printed upright.",
+    (
+        "Better stability and lower failure risk.",
+        "May require more supports depending on shape.",
+    ),
+)
+
+_BASE_TIP = "Clean bed and use appropriate bed temp for your material."
+
+# (flag, bed adhesion tip, warning), in output order
+_FLAG_NOTES = (
+    (TALL, "Use a brim (5–10mm) for extra stability.", "Orientation chosen to reduce tipping risk (tall vs. wide)."),
+    (
+        SMALL_FOOTPRINT,
+        "Small footprint: consider brim or mouse-ears for adhesion.",
+        "Small footprint detected. Bed adhesion may be critical.",
+    ),
+)
+
+
+def _orientation_flags(aspect: float, footprint_mm2: float, tags: FrozenSet[str]) -> int:
+    flags = 0
+    # Stability heuristics (more reliable with STL)
+    if aspect >= TALL_ASPECT_RATIO:
+        flags |= TALL
+    if 0 < footprint_mm2 <= SMALL_FOOTPRINT_MM2:
+        flags |= SMALL_FOOTPRINT
+    if "visible_face" in tags:
+        flags |= VISIBLE_FACE
+    return flags
 
 
 def plan_orientation_node(state: PlanState) -> PlanState:
@@ -8,11 +60,10 @@ def plan_orientation_node(state: PlanState) -> PlanState:
     If STL features exist, prefer them (bbox/footprint/aspect).
     Falls back to normalized height/width if STL is not present.
     """
-    norm = state.get("input_norm", {})
-    desc = (norm.get("description") or "").lower()
+    view = norm_view(state)
 
-    warnings: List[str] = state.get("warnings", [])
-    assumptions: List[str] = state.get("assumptions", [])
+    warnings: List[str] = state.setdefault("warnings", [])
+    assumptions: List[str] = state.setdefault("assumptions", [])
 
     # --- Prefer STL signals when available ---
     stl = state.get("stl_features") or {}
@@ -24,40 +75,21 @@ def plan_orientation_node(state: PlanState) -> PlanState:
         aspect = float(stl.get("aspect_ratio", (h / w) if (h > 0 and w > 0) else 0.0))
         used_stl = True
     else:
-        h = float(norm.get("height_mm", 0) or 0)
-        w = float(norm.get("width_mm", 0) or 0)
+        h, w, aspect = view.h, view.w, view.aspect
         footprint_mm2 = float(w * w) if w > 0 else 0.0  # weak fallback
-        aspect = (h / w) if (h > 0 and w > 0) else 0.0
         used_stl = False
 
-    # Defaults
-    recommended = "Lay flat on the largest face"
-    reason = "Maximizes bed contact and reduces the chance of tipping."
-    tradeoffs = [
-        "May change which surfaces look best (aesthetic trade-off).",
-        "May increase support needs depending on overhangs.",
-    ]
-    bed_adhesion_tips = ["Clean bed and use appropriate bed temp for your material."]
-
-    # --- Stability heuristics (now more reliable with STL) ---
-    if aspect >= 3.0:
-        recommended = "Lay flat (prioritize the widest footprint)"
-        reason = "Tall geometry (high aspect ratio) suggests instability if printed upright."
-        tradeoffs = [
-            "Better stability and lower failure risk.",
-            "May require more supports depending on shape.",
-        ]
-        bed_adhesion_tips.append("Use a brim (5–10mm) for extra stability.")
-        warnings.append("Orientation chosen to reduce tipping risk (tall vs. wide).")
-
-    # --- Small footprint heuristics (use footprint if we have it) ---
-    # Rough threshold: < 500 mm² is tiny (e.g., ~22mm x 22mm)
-    if footprint_mm2 > 0 and footprint_mm2 <= 500:
-        bed_adhesion_tips.append("Small footprint: consider brim or mouse-ears for adhesion.")
-        warnings.append("Small footprint detected. Bed adhesion may be critical.")
+    flags = _orientation_flags(aspect, footprint_mm2, view.tags)
+    recommended, reason, tradeoffs = _TALL_PROFILE if flags & TALL else _DEFAULT_PROFILE
+
+    bed_adhesion_tips = [_BASE_TIP]
+    for flag, tip, warning in _FLAG_NOTES:
+        if flags & flag:
+            bed_adhesion_tips.append(tip)
+            warnings.append(warning)
 
     # Keyword hinting (light touch)
-    if any(k in desc for k in ["logo", "text", "engrave", "face", "front"]):
+    if flags & VISIBLE_FACE:
         assumptions.append(
             "Description suggests a visible 'face' (logo/text). Consider orienting to keep that face clean and support-free."
         )
@@ -72,10 +104,8 @@ def plan_orientation_node(state: PlanState) -> PlanState:
             "footprint_mm2": round(footprint_mm2, 2),
             "used_stl": used_stl,
         },
-        "tradeoffs": tradeoffs,
+        "tradeoffs": list(tradeoffs),
         "bed_adhesion_tips": bed_adhesion_tips,
     }
 
-    state["warnings"] = warnings
-    state["assumptions"] = assumptions
     return state
\ No newline at end of file
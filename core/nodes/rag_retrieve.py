@@ -1,16 +1,14 @@
 from __future__ import annotations
 
-from typing import Any
-
 from core.rag.retriever import retrieve
 from core.state import PlanState
 
 
-from core.state import PlanState
-from core.rag.retriever import retrieve
-
-
 def rag_retrieve_node(state: PlanState) -> PlanState:
+    """
+    Retrieve knowledge snippets for the request.
+    Query = description + height/width, which for STL uploads STL_ANALYZE fills in (see core.workflow).
+    """
     desc = (state.get("description") or "").strip()
     h = state.get("height_mm")
     w = state.get("width_mm")
@@ -32,9 +30,11 @@ def rag_retrieve_node(state: PlanState) -> PlanState:
         sources.append(src)
         snippets.append(f"SOURCE: {src}\n{text}")
 
-    state["rag_context"] = "\n\n---\n\n".join(snippets)
-    state["rag_sources"] = list(dict.fromkeys(sources))  # unique, keep order
     MAX_RAG_CHARS = 1800
-    state["rag_context"] = state["rag_context"][:MAX_RAG_CHARS]
 
-    return state
\ No newline at end of file
+    # Only the RAG keys: this node runs as a parallel branch next to the planning chain (see core.workflow),
+    # so returning the whole state would collide with the other branch's writes.
+    return {
+        "rag_context": "\n\n---\n\n".join(snippets)[:MAX_RAG_CHARS],
+        "rag_sources": list(dict.fromkeys(sources)),  # unique, keep order
+    }
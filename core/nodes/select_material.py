@@ -1,5 +1,9 @@
 from typing import Any, Dict, List
-from core.state import PlanState
+from core.state import PlanState, norm_view
+
+# state["material"]["recommended"] is always one of these canonical (uppercase) names;
+# downstream nodes compare against it directly.
+DEFAULT_MATERIAL = "PLA"
 
 
 def select_material_node(state: PlanState) -> PlanState:
@@ -7,40 +11,36 @@ def select_material_node(state: PlanState) -> PlanState:
     Decide recommended filament material based on normalized input + description keywords.
     Rule-based (no LLM).
     """
-    norm = state.get("input_norm", {})
-    desc: str = (norm.get("description") or "").lower()
-
-    warnings: List[str] = state.get("warnings", [])
-    assumptions: List[str] = state.get("assumptions", [])
+    view = norm_view(state)
+    desc: str = view.desc_lower
+    tags = view.tags  # keyword buckets, scanned once in normalize_input (see core.keywords)
 
-    height = float(norm.get("height_mm", 0) or 0)
-    width = float(norm.get("width_mm", 0) or 0)
+    warnings: List[str] = state.setdefault("warnings", [])
+    assumptions: List[str] = state.setdefault("assumptions", [])
 
-    # Helper: keyword detection
-    def has_any(words: List[str]) -> bool:
-        return any(w in desc for w in words)
+    height, width = view.h, view.w
 
     # Defaults
-    material = "PLA"
+    material = DEFAULT_MATERIAL
     reason = "PLA is easy to print and suitable for most decorative or general-purpose models."
     alternatives = ["PETG"]
 
     # --- TPU (flexible) ---
-    if has_any(["tpu", "flex", "flexible", "rubber", "gasket", "seal", "phone case", "bumper"]):
+    if "flexible" in tags:
         material = "TPU"
         reason = "Description suggests flexibility/elasticity. TPU is the go-to flexible filament."
         alternatives = ["PETG (semi-flex depending on part)", "PLA (not flexible)"]
         assumptions.append("Assuming you want a flexible part based on description keywords.")
 
     # --- Outdoor / UV / weather resistance → ASA ---
-    elif has_any(["outdoor", "sun", "uv", "weather", "rain", "garden", "car", "roof"]):
+    elif "outdoor" in tags:
         material = "ASA"
         reason = "Outdoor/UV exposure suggested. ASA is preferred for UV and weather resistance."
         alternatives = ["PETG", "ABS"]
         warnings.append("ASA/ABS typically prints best with an enclosure and good ventilation.")
 
     # --- Heat resistance / functional part → ABS or ASA ---
-    elif has_any(["heat", "hot", "engine", "motor", "high temp", "kitchen", "dishwasher"]):
+    elif "heat" in tags:
         material = "ABS"
         reason = "Heat exposure suggested. ABS offers better temperature resistance than PLA/PETG."
         alternatives = ["ASA", "PETG"]
@@ -69,6 +69,4 @@ def select_material_node(state: PlanState) -> PlanState:
         },
     }
 
-    state["warnings"] = warnings
-    state["assumptions"] = assumptions
     return state
\ No newline at end of file
@@ -1,17 +1,17 @@
 from core.state import PlanState
-from core.stl import analyze_stl
+from core.stl import get_or_compute
 
 
 def stl_analyze_node(state: PlanState) -> PlanState:
     """
-    If stl_path exists, analyze STL and store stl_features.
+    If stl_path exists, analyze STL (cached by file content, see core.stl.cache) and store stl_features.
     Also auto-fill height_mm and width_mm so the existing pipeline keeps working.
     """
     path = (state.get("stl_path") or "").strip()
     if not path:
         return state
 
-    feats = analyze_stl(path)
+    feats = get_or_compute(path)
     state["stl_features"] = feats
 
     # Backwards compatibility with existing logic:
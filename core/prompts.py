@@ -1,11 +1,14 @@
+from functools import lru_cache
 from pathlib import Path
 
 PROMPTS_DIR = Path(__file__).resolve().parents[1] / "prompts"
 
+@lru_cache(maxsize=64)
 def load_prompt(relative_path: str) -> str:
     """
     Load a prompt text file from /prompts.
     Example: load_prompt("system/base_system.txt")
+    Prompts don't change at runtime, so each file is read once per process.
     """
     path = PROMPTS_DIR / relative_path
     return path.read_text(encoding="utf-8")
\ No newline at end of file
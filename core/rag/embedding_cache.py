@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from functools import lru_cache
+from typing import List, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from core.config import cache_dir
+
+
+def _enabled() -> bool:
+    return os.getenv("SLICEBUDDY_EMBED_CACHE", "true").lower() in ("1", "true", "yes")
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings client so repeated query strings skip the network round-trip.
+    Queries are keyed by sha256(model + text) in-process (LRU) and on disk in
+    cache_dir("embeddings.sqlite") as float32 blobs. Documents (index builds) pass straight through.
+    Set SLICEBUDDY_EMBED_CACHE=false to always call upstream.
+    """
+
+    def __init__(self, upstream: Embeddings, model: str, maxsize: int = 256) -> None:
+        self.upstream = upstream
+        self.model = model
+        self._path = cache_dir("embeddings.sqlite")
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._lookup = lru_cache(maxsize=maxsize)(self._lookup_uncached)
+
+    def _db(self) -> sqlite3.Connection:
+        # caller holds self._lock
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self._path, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL)")
+        return self._conn
+
+    def _lookup_uncached(self, key: str, text: str) -> Tuple[float, ...]:
+        try:
+            with self._lock:
+                row = self._db().execute("SELECT vec FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                return tuple(array("f", row[0]))
+        except sqlite3.Error:
+            pass
+
+        vec = self.upstream.embed_query(text)
+        try:
+            with self._lock, self._db() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)",
+                    (key, array("f", vec).tobytes()),
+                )
+        except sqlite3.Error:
+            pass  # cache is best-effort
+        return tuple(vec)
+
+    def embed_query(self, text: str) -> List[float]:
+        if not _enabled():
+            return self.upstream.embed_query(text)
+        key = hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+        return list(self._lookup(key, text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.upstream.embed_documents(texts)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
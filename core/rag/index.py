@@ -1,53 +1,139 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import mmap
+import os
+import tempfile
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, Iterator, List
 
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
-from langchain_chroma import Chroma
+
+from core.config import vector_store_backend
+from core.rag.numpy_store import NumpyVectorStore
 
 
 
 # Repo paths
 REPO_ROOT = Path(__file__).resolve().parents[2]
 KNOWLEDGE_DIR = REPO_ROOT / "knowledge"
-CHROMA_DIR = REPO_ROOT / ".chroma"  # local persistent storage
+CHROMA_DIR = REPO_ROOT / ".chroma"  # local persistent storage (both vector store backends)
 COLLECTION_NAME = "slicebuddy_knowledge"
+MANIFEST_PATH = CHROMA_DIR / "manifest.json"  # {"backend": ..., "chunking": ..., "sources": {source_path: sha256}}
+
+# Changing any of these invalidates every stored chunk (full rebuild on the next run).
+CHUNKING: Dict[str, Any] = {
+    "chunk_size": 900,
+    "chunk_overlap": 150,
+    "separators": ["\n## ", "\n### ", "\n", " ", ""],
+}
+
+
+def _iter_md(root: Path) -> Iterator[str]:
+    """Paths of all .md files under root (recursive, explicit scandir stack; symlinked dirs not followed)."""
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".md") and entry.is_file():
+                        yield entry.path
+        except FileNotFoundError:
+            continue
+
+
+def _read_text(path: str) -> str:
+    # Same result as Path.read_text(encoding="utf-8") (incl. newline translation), read through one mmap.
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            text = buf[:].decode("utf-8")
+    return text.replace("\r\n", "\n").replace("\r", "\n") if "\r" in text else text
 
 
 def load_markdown_knowledge() -> List[Document]:
     """Load all .md files under /knowledge into Documents."""
-    docs: List[Document] = []
-    for path in KNOWLEDGE_DIR.glob("**/*.md"):
-        text = path.read_text(encoding="utf-8")
-        docs.append(Document(page_content=text, metadata={"source": str(path)}))
-    return docs
+    return [
+        Document(page_content=_read_text(path), metadata={"source": path})
+        for path in _iter_md(KNOWLEDGE_DIR)
+    ]
+
+
+def _load_manifest() -> Dict[str, Any]:
+    try:
+        manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _write_manifest(manifest: Dict[str, Any]) -> None:
+    # write-then-rename so an interrupted build never leaves a half-written manifest
+    fd, tmp = tempfile.mkstemp(dir=CHROMA_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, MANIFEST_PATH)
 
 
 def build_or_update_index() -> None:
     """
-    Build a persistent Chroma index from knowledge/*.md.
+    Build or incrementally update the persistent vector index from knowledge/*.md
+    (NumPy store by default, Chroma with SLICEBUDDY_VECTOR_STORE=chroma).
     Run this after adding/updating knowledge files.
+    Only files whose content hash differs from .chroma/manifest.json are re-split and re-embedded;
+    chunks of changed or deleted files are removed first. A missing manifest, a different backend
+    or changed chunking settings rebuild the whole collection.
     """
     docs = load_markdown_knowledge()
     if not docs:
         raise RuntimeError(f"No markdown files found under: {KNOWLEDGE_DIR}")
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=900,
-        chunk_overlap=150,
-        separators=["\n## ", "\n### ", "\n", " ", ""],
-    )
-    chunks = splitter.split_documents(docs)
+    current = {
+        d.metadata["source"]: hashlib.sha256(d.page_content.encode("utf-8")).hexdigest() for d in docs
+    }
+    manifest = _load_manifest()
+    backend = vector_store_backend()
+    full_rebuild = manifest.get("chunking") != CHUNKING or manifest.get("backend") != backend
+    previous: Dict[str, str] = {} if full_rebuild else manifest.get("sources", {})
 
     embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+    CHROMA_DIR.mkdir(parents=True, exist_ok=True)
+    if backend == "chroma":
+        from langchain_chroma import Chroma
+
+        vs = Chroma(
+            persist_directory=str(CHROMA_DIR),
+            collection_name=COLLECTION_NAME,
+            embedding_function=embeddings,
+        )
+    else:
+        vs = NumpyVectorStore.load(CHROMA_DIR, embedding_function=embeddings)
+
+    if full_rebuild:
+        vs.reset_collection()
+    else:
+        for src in previous.keys() - current.keys():
+            vs.delete(where={"source": src})
+
+    changed = [d for d in docs if previous.get(d.metadata["source"]) != current[d.metadata["source"]]]
+    if changed:
+        for d in changed:
+            if d.metadata["source"] in previous:
+                vs.delete(where={"source": d.metadata["source"]})
+
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHUNKING["chunk_size"],
+            chunk_overlap=CHUNKING["chunk_overlap"],
+            separators=CHUNKING["separators"],
+        )
+        vs.add_documents(splitter.split_documents(changed))
 
-    # This creates/overwrites the collection in a persistent local folder.
-    Chroma.from_documents(
-        documents=chunks,
-        embedding=embeddings,
-        persist_directory=str(CHROMA_DIR),
-        collection_name=COLLECTION_NAME,
-    )
\ No newline at end of file
+    if isinstance(vs, NumpyVectorStore):
+        vs.save()
+    _write_manifest({"backend": backend, "chunking": CHUNKING, "sources": current})
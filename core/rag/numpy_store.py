@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+VECTORS_FILE = "vectors.npy"
+CHUNKS_FILE = "chunks.json"
+
+
+class NumpyVectorStore:
+    """
+    Brute-force cosine search over unit-normalized float32 vectors, for the small knowledge corpus.
+    Persisted as <dir>/vectors.npy (memory-mapped on load) + <dir>/chunks.json (text + metadata per row).
+    Mirrors the slice of the Chroma API SliceBuddy uses: similarity_search(_by_vector), add_documents,
+    delete(where={"source": ...}) and reset_collection; call save() after mutating.
+    """
+
+    def __init__(self, directory: Path, embedding_function: Embeddings) -> None:
+        self.directory = Path(directory)
+        self.embedding_function = embedding_function
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.chunks: List[Dict[str, Any]] = []
+
+    @classmethod
+    def load(cls, directory: Path, embedding_function: Embeddings) -> "NumpyVectorStore":
+        store = cls(directory, embedding_function)
+        try:
+            store.chunks = json.loads((store.directory / CHUNKS_FILE).read_text(encoding="utf-8"))
+            store.vectors = np.load(store.directory / VECTORS_FILE, mmap_mode="r")
+        except FileNotFoundError:
+            store.chunks = []  # not built yet: behaves like an empty collection
+        return store
+
+    def save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # write-then-rename so a running retriever never maps a half-written file
+        for name, write in (
+            (VECTORS_FILE, lambda f: np.save(f, np.ascontiguousarray(self.vectors, dtype=np.float32))),
+            (CHUNKS_FILE, lambda f: f.write(json.dumps(self.chunks).encode("utf-8"))),
+        ):
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, self.directory / name)
+
+    def reset_collection(self) -> None:
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.chunks = []
+
+    def delete(self, where: Dict[str, Any]) -> None:
+        keep = [i for i, c in enumerate(self.chunks) if any(c["metadata"].get(k) != v for k, v in where.items())]
+        self.chunks = [self.chunks[i] for i in keep]
+        self.vectors = np.asarray(self.vectors)[keep] if keep else np.empty((0, 0), dtype=np.float32)
+
+    def add_documents(self, documents: List[Document]) -> None:
+        if not documents:
+            return
+        vecs = np.asarray(
+            self.embedding_function.embed_documents([d.page_content for d in documents]), dtype=np.float32
+        )
+        vecs /= np.maximum(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12)
+        self.vectors = np.concatenate([self.vectors, vecs]) if len(self.chunks) else vecs
+        self.chunks.extend({"page_content": d.page_content, "metadata": d.metadata} for d in documents)
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        if not self.chunks:
+            return []
+        return self.similarity_search_by_vector(self.embedding_function.embed_query(query), k=k)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4) -> List[Document]:
+        n = len(self.chunks)
+        if n == 0:
+            return []
+        q = np.asarray(embedding, dtype=np.float32)
+        sims = self.vectors @ q  # rows are unit length; |q| doesn't change the ranking
+        k = min(k, n)
+        top = np.argpartition(sims, n - k)[n - k:] if k < n else np.arange(n)
+        top = top[np.argsort(-sims[top])]
+        return [Document(**self.chunks[i]) for i in top]
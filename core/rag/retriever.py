@@ -1,34 +1,145 @@
 from __future__ import annotations
 
+import atexit
+import logging
+import os
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Tuple, Union
 
-from langchain_openai import OpenAIEmbeddings
 from langchain_core.documents import Document
-from langchain_chroma import Chroma
-from dotenv import load_dotenv
-load_dotenv()
 
+from core.cache import SemanticCache
+from core.config import load_env, vector_store_backend
+from core.rag.embedding_cache import CachedEmbeddings
+
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+    from core.rag.numpy_store import NumpyVectorStore
+
+load_env()
+
+
+logger = logging.getLogger(__name__)
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 CHROMA_DIR = REPO_ROOT / ".chroma"
 COLLECTION_NAME = "slicebuddy_knowledge"
 
 
-def get_vectorstore() -> Chroma:
-    """Load the persistent Chroma vector store from disk."""
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+_VECTORSTORE_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> CachedEmbeddings:
+    """
+    Shared embeddings client (one HTTP connection pool per process).
+    Query embeddings are cached by text, see core.rag.embedding_cache.
+    """
+    from langchain_openai import OpenAIEmbeddings
+
+    return CachedEmbeddings(OpenAIEmbeddings(model=EMBEDDING_MODEL), model=EMBEDDING_MODEL)
+
+
+def _open_chroma() -> "Chroma":
+    # Imported here: chromadb is heavy and only needed when that backend is used.
+    from langchain_chroma import Chroma
+
     return Chroma(
         persist_directory=str(CHROMA_DIR),
         collection_name=COLLECTION_NAME,
-        embedding_function=embeddings,
+        embedding_function=get_embeddings(),
     )
 
 
+@lru_cache(maxsize=1)
+def _open_vectorstore() -> Union["Chroma", "NumpyVectorStore"]:
+    if vector_store_backend() == "chroma":
+        return _open_chroma()
+
+    from core.rag.numpy_store import CHUNKS_FILE, NumpyVectorStore
+
+    if not (CHROMA_DIR / CHUNKS_FILE).exists():
+        if (CHROMA_DIR / "chroma.sqlite3").exists():
+            # Index built before numpy became the default: keep serving it rather than returning nothing.
+            logger.warning(
+                "No NumPy vector index in %s; falling back to the existing Chroma index. "
+                "Run `python scripts/build_index.py` to build it.", CHROMA_DIR,
+            )
+            return _open_chroma()
+        logger.warning(
+            "No vector index in %s: RAG context stays empty until `python scripts/build_index.py` is run.",
+            CHROMA_DIR,
+        )
+    return NumpyVectorStore.load(CHROMA_DIR, embedding_function=get_embeddings())
+
+
+def get_vectorstore() -> Union["Chroma", "NumpyVectorStore"]:
+    """
+    Load the persistent vector store from disk (backend per core.config.vector_store_backend).
+    Opened once per process and reused; the lock keeps concurrent first requests
+    (threadpool / to_thread callers) from opening it twice.
+    An empty NumPy store (index not built yet) isn't kept, so a later build_index run is picked up
+    without restarting the process.
+    """
+    from core.rag.numpy_store import NumpyVectorStore
+
+    with _VECTORSTORE_LOCK:
+        store = _open_vectorstore()
+        if isinstance(store, NumpyVectorStore) and not store.chunks:
+            _open_vectorstore.cache_clear()
+        return store
+
+
+@atexit.register
+def _close_vectorstore() -> None:
+    """Release the cached Chroma client (SQLite handle + loaded segments) at interpreter exit."""
+    if _open_vectorstore.cache_info().currsize:
+        from core.rag.numpy_store import NumpyVectorStore
+
+        if not isinstance(_open_vectorstore(), NumpyVectorStore):  # chroma, selected or fallen back to
+            from chromadb.api.client import SharedSystemClient
+
+            SharedSystemClient.clear_system_cache()
+    _open_vectorstore.cache_clear()
+    if get_embeddings.cache_info().currsize:
+        get_embeddings().close()
+
+
+def _retrieval_cache_enabled() -> bool:
+    """
+    Off by default, like the /plan semantic cache (core.cache): a hit returns the chunks retrieved for a
+    *different* (if near-identical) query. Set SLICEBUDDY_RAG_CACHE=true to enable.
+    """
+    return os.getenv("SLICEBUDDY_RAG_CACHE", "false").lower() in ("1", "true", "yes")
+
+
+# Retrieval results by query embedding: a query whose embedding is within the cosine threshold of an
+# earlier one (same k) reuses that query's chunks instead of searching the store again.
+_RETRIEVAL_CACHE = SemanticCache(
+    lambda q: get_embeddings().embed_query(q),
+    threshold=float(os.getenv("SLICEBUDDY_RAG_CACHE_THRESHOLD", "0.95")),
+    maxsize=1024,
+)
+
+
 def retrieve(query: str, k: int = 3) -> List[Document]:
     """
     Retrieve top-k relevant chunks for a query.
     Returns LangChain Document objects with page_content + metadata.
+    With SLICEBUDDY_RAG_CACHE=true, near-duplicate queries are served from an in-process cache.
     """
-    vs = get_vectorstore()
-    return vs.similarity_search(query, k=k)
\ No newline at end of file
+    if not _retrieval_cache_enabled():
+        return get_vectorstore().similarity_search(query, k=k)
+
+    # Embed once: the same vector serves the cache lookup, the search and the cache insert.
+    vec = get_embeddings().embed_query(query)
+    cached = _RETRIEVAL_CACHE.get(str(k), query, vector=vec)
+    if cached is not None:
+        return list(cached)
+    docs = get_vectorstore().similarity_search_by_vector(vec, k=k)
+    _RETRIEVAL_CACHE.put(str(k), query, docs, vector=vec)
+    return list(docs)
\ No newline at end of file
@@ -1,4 +1,46 @@
-from typing import TypedDict, List, Dict, Any
+from dataclasses import dataclass
+from typing import TypedDict, List, Dict, Any, FrozenSet, Tuple
+
+from core.keywords import scan_tags
+
+
+class STLFeaturesDict(TypedDict, total=False):
+    """Shape of state["stl_features"]: asdict(core.stl.analyze.STLFeatures), types guaranteed by the producer."""
+    bbox_mm: Tuple[float, float, float]
+    footprint_bbox_mm2: float
+    contact_area_mm2: float
+    contact_ratio: float
+    height_mm: float
+    aspect_ratio: float
+    volume_mm3: float
+    surface_area_mm2: float
+    watertight: bool
+    is_volume: bool
+    overhang_percent: float
+    max_overhang_deg: float
+    likely_supports: bool
+    boundary_edges: int
+    nonmanifold_edges: int
+    open_edges: int
+    degenerate_faces: int
+    likely_open_top: bool
+    mesh_issue: str
+    bounds_mm: Tuple[Tuple[float, float, float], Tuple[float, float, float]]
+
+
+@dataclass(slots=True, frozen=True)
+class NormView:
+    """
+    Derived view of input_norm, computed once by normalize_input_node.
+    Downstream nodes read these instead of re-lowercasing / re-coercing input_norm.
+    h/w are the rounded values stored in input_norm, aspect is h / w (input_norm["aspect_ratio"] is
+    its rounded display value); tags is scan_tags(desc_lower) (see core.keywords).
+    """
+    desc_lower: str
+    h: float
+    w: float
+    aspect: float
+    tags: FrozenSet[str]
 
 
 class PlanState(TypedDict, total=False):
@@ -9,7 +51,7 @@ class PlanState(TypedDict, total=False):
 
     # STL input (optional)
     stl_path: str
-    stl_features: Dict[str, Any]
+    stl_features: STLFeaturesDict
 
     # --- Control flags ---
     stop: bool
@@ -17,6 +59,7 @@ class PlanState(TypedDict, total=False):
     # --- Normalized/validated inputs ---
     input_raw: Dict[str, Any]
     input_norm: Dict[str, Any]
+    input_norm_view: NormView
 
     # --- Diagnostics for transparency ---
     assumptions: List[str]
@@ -34,4 +77,22 @@ class PlanState(TypedDict, total=False):
 
     # --- RAG ---
     rag_context: str
-    rag_sources: List[str]
\ No newline at end of file
+    rag_sources: List[str]
+
+
+def norm_view(state: PlanState) -> NormView:
+    """state["input_norm_view"], or one built from input_norm (e.g. when a node is run on its own)."""
+    view = state.get("input_norm_view")
+    if view is not None:
+        return view
+    norm = state.get("input_norm", {})
+    h = float(norm.get("height_mm", 0) or 0)
+    w = float(norm.get("width_mm", 0) or 0)
+    desc_lower = (norm.get("description") or "").lower()
+    return NormView(
+        desc_lower=desc_lower,
+        h=h,
+        w=w,
+        aspect=(h / w) if (h > 0 and w > 0) else 0.0,
+        tags=scan_tags(desc_lower),
+    )
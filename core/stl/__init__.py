@@ -1 +1,2 @@
-from .analyze import analyze_stl
\ No newline at end of file
+from .analyze import analyze_stl
+from .cache import get_or_compute
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass, asdict
 from typing import Any, Dict, Tuple
 import numpy as np
 import trimesh
 
+from .fast_stl import load_mesh
 
-@dataclass
+
+@dataclass(slots=True)
 class STLFeatures:
     bbox_mm: Tuple[float, float, float]  # (x, y, z)
     footprint_bbox_mm2: float            # bbox x*y
@@ -35,31 +38,30 @@ class STLFeatures:
     bounds_mm: Tuple[Tuple[float, float, float], Tuple[float, float, float]]  # (min), (max)
 
 
-def _estimate_contact_area_xy(mesh: trimesh.Trimesh, tol_mm: float = 0.3) -> float:
+def _estimate_contact_area_xy(mesh: trimesh.Trimesh, z_min: float, tol_mm: float = 0.3) -> float:
     if mesh.faces is None or len(mesh.faces) == 0:
         return 0.0
 
     verts = mesh.vertices
     faces = mesh.faces
     z = verts[:, 2]
-    z_min = float(z.min())
-
-    face_verts = verts[faces]  # (F, 3, 3)
-    z_face = face_verts[:, :, 2]
-    mask = (z_face <= (z_min + tol_mm)).all(axis=1)
 
-    bottom_faces = face_verts[mask]
-    if bottom_faces.shape[0] == 0:
+    # Classify vertices once, then faces by their 3 vertex flags; only bottom faces get gathered
+    # (instead of materializing the full (F, 3, 3) vertex array).
+    low = z <= (z_min + tol_mm)
+    mask = low[faces].all(axis=1)
+    if not mask.any():
         return 0.0
 
-    a = bottom_faces[:, 0, :2]
-    b = bottom_faces[:, 1, :2]
-    c = bottom_faces[:, 2, :2]
+    bottom = faces[mask]  # (N, 3) vertex indices, N = bottom faces only
 
-    ab = b - a
-    ac = c - a
-    cross = ab[:, 0] * ac[:, 1] - ab[:, 1] * ac[:, 0]
-    area = 0.5 * np.abs(cross).sum()
+    # Gather x / y per corner as flat 1-D arrays (z is never read) and take the 2-D cross directly.
+    x = verts[:, 0]
+    y = verts[:, 1]
+    ax, bx, cx = x[bottom[:, 0]], x[bottom[:, 1]], x[bottom[:, 2]]
+    ay, by, cy = y[bottom[:, 0]], y[bottom[:, 1]], y[bottom[:, 2]]
+
+    area = 0.5 * np.abs((bx - ax) * (cy - ay) - (by - ay) * (cx - ax)).sum()
     return float(area)
 
 
@@ -74,83 +76,68 @@ def _overhang_metrics(mesh: trimesh.Trimesh, threshold_deg: float = 55.0) -> tup
     if not np.any(down):
         return 0.0, 0.0, False
 
-    nz_abs = np.clip(np.abs(nz[down]), 0.0, 1.0)
-    ang = np.degrees(np.arccos(nz_abs))  # 0=vertical, 90=horizontal
-    max_overhang = float(np.max(ang)) if ang.size else 0.0
+    # Overhang angle is arccos(|nz|) (0=vertical, 90=horizontal). arccos is decreasing, so compare |nz|
+    # against cos(threshold) and take the max angle from min |nz|: one scalar acos instead of F.
+    nz_abs = np.abs(nz[down])
+    max_overhang = math.degrees(math.acos(min(1.0, float(nz_abs.min()))))
 
-    support_worthy = ang >= threshold_deg
-    pct = float(100.0 * np.mean(support_worthy)) if ang.size else 0.0
+    support_worthy = nz_abs <= math.cos(math.radians(threshold_deg))
+    pct = float(100.0 * np.mean(support_worthy))
 
     likely = pct >= 2.0 or max_overhang >= (threshold_deg + 10)
     return float(pct), float(max_overhang), bool(likely)
 
 
-def _edge_histogram_counts(mesh: trimesh.Trimesh) -> tuple[int, int]:
-    """Return (boundary_edges, nonmanifold_edges) computed from face edge usage counts."""
+def _edge_stats(mesh: trimesh.Trimesh) -> tuple[int, int, np.ndarray]:
+    """
+    Return (boundary_edges, nonmanifold_edges, boundary_edge_array) from face edge usage counts.
+    boundary_edge_array is (B, 2) vertex indices of the edges used by exactly one face.
+    """
     if mesh.faces is None or len(mesh.faces) == 0:
-        return 0, 0
+        return 0, 0, np.empty((0, 2), dtype=np.int64)
 
     f = np.asarray(mesh.faces, dtype=np.int64)
 
-    # Build all edges from faces: (0,1), (1,2), (2,0)
-    e01 = f[:, [0, 1]]
-    e12 = f[:, [1, 2]]
-    e20 = f[:, [2, 0]]
-    edges = np.vstack([e01, e12, e20])
+    # Edge endpoints from faces: (0,1), (1,2), (2,0), as two flat columns
+    u = f.ravel()
+    v = np.roll(f, -1, axis=1).ravel()
+
+    # Normalize direction with elementwise min/max so (a,b) == (b,a) (cheaper than a row-wise np.sort)
+    lo = np.minimum(u, v)
+    hi = np.maximum(u, v)
 
-    # Normalize direction: sort each edge so (a,b) == (b,a)
-    edges = np.sort(edges, axis=1)
+    # Count occurrences: pack each (a, b) into one int64 key (vertex indices fit in 32 bits)
+    # so np.unique runs on a flat 1-D array instead of a Python dict loop.
+    keys = (lo << 32) | hi
+    uniq, counts = np.unique(keys, return_counts=True)
 
-    # Count occurrences using tuples (safe across numpy versions / contiguity)
-    counts: Dict[tuple[int, int], int] = {}
-    for a, b in edges:
-        key = (int(a), int(b))
-        counts[key] = counts.get(key, 0) + 1
+    boundary_keys = uniq[counts == 1]
+    boundary_edge_array = np.stack([boundary_keys >> 32, boundary_keys & 0xFFFFFFFF], axis=1)
 
-    boundary = sum(1 for c in counts.values() if c == 1)
-    nonmanifold = sum(1 for c in counts.values() if c >= 3)
-    return int(boundary), int(nonmanifold)
+    nonmanifold = np.count_nonzero(counts >= 3)
+    return int(boundary_keys.size), int(nonmanifold), boundary_edge_array
 
 
 def _degenerate_face_count(mesh: trimesh.Trimesh, eps: float = 1e-10) -> int:
-    """Count triangles with near-zero area."""
+    """Count triangles with near-zero area (|ab x ac| = 2*area <= eps)."""
     try:
-        tris = mesh.triangles  # (F,3,3)
-        a = tris[:, 0, :]
-        b = tris[:, 1, :]
-        c = tris[:, 2, :]
-        ab = b - a
-        ac = c - a
-        cross = np.cross(ab, ac)
-        area2 = np.linalg.norm(cross, axis=1)  # 2*area
-        return int(np.sum(area2 <= eps))
+        # area_faces is cached on the mesh and reused by mesh.area (surface_area_mm2), so the
+        # cross products are computed once for both.
+        return int(np.count_nonzero(mesh.area_faces <= eps / 2.0))
     except Exception:
         return 0
 
 
-def _likely_open_top_from_boundary(mesh: trimesh.Trimesh, boundary_edges: int, tol_mm: float = 0.5) -> bool:
-    if boundary_edges <= 0:
+def _likely_open_top_from_boundary(
+    mesh: trimesh.Trimesh, boundary_edge_array: np.ndarray, z_max: float, tol_mm: float = 0.5
+) -> bool:
+    """True when most boundary edges (from _edge_stats) sit at the top of the model: an open rim."""
+    if boundary_edge_array.size == 0:
         return False
 
     try:
-        f = mesh.faces.astype(np.int64)
-        e01 = f[:, [0, 1]]
-        e12 = f[:, [1, 2]]
-        e20 = f[:, [2, 0]]
-        edges = np.vstack([e01, e12, e20])
-        edges = np.sort(edges, axis=1)
-
-        edges_view = edges.view([("a", edges.dtype), ("b", edges.dtype)])
-        uniq, counts = np.unique(edges_view, return_counts=True)
-
-        boundary_mask = (counts == 1)
-        boundary_edges_arr = uniq[boundary_mask].view(edges.dtype).reshape(-1, 2)
-        if boundary_edges_arr.size == 0:
-            return False
-
         v = mesh.vertices
-        z_max = float(v[:, 2].max())
-        ez = (v[boundary_edges_arr[:, 0], 2] + v[boundary_edges_arr[:, 1], 2]) / 2.0
+        ez = (v[boundary_edge_array[:, 0], 2] + v[boundary_edge_array[:, 1], 2]) / 2.0
         near_top = ez >= (z_max - tol_mm)
         ratio = float(np.mean(near_top)) if ez.size else 0.0
         return ratio >= 0.70
@@ -179,9 +166,7 @@ def _mesh_issue_summary(watertight: bool, is_volume: bool, boundary_edges: int,
 
 
 def analyze_stl(path: str) -> Dict[str, Any]:
-    mesh = trimesh.load(path, force="mesh")
-    if isinstance(mesh, trimesh.Scene):
-        mesh = trimesh.util.concatenate([g for g in mesh.geometry.values()])
+    mesh = load_mesh(path)
 
     x, y, z = [float(v) for v in mesh.extents]
     footprint_bbox = float(x * y)
@@ -193,15 +178,21 @@ def analyze_stl(path: str) -> Dict[str, Any]:
     bmin = tuple(float(v) for v in mesh.bounds[0])
     bmax = tuple(float(v) for v in mesh.bounds[1])
 
-    contact_area = _estimate_contact_area_xy(mesh, tol_mm=0.3)
+    # Vertex z range, read once for the contact-area and open-top helpers.
+    z_col = mesh.vertices[:, 2]
+    z_min = float(z_col.min()) if z_col.size else 0.0
+    z_max = float(z_col.max()) if z_col.size else 0.0
+
+    contact_area = _estimate_contact_area_xy(mesh, z_min, tol_mm=0.3)
     contact_ratio = float(contact_area / footprint_bbox) if footprint_bbox > 0 else 0.0
 
     overhang_pct, max_overhang_deg, likely_supports = _overhang_metrics(mesh, threshold_deg=55.0)
 
-    boundary_edges, nonmanifold_edges = _edge_histogram_counts(mesh)
+    # One edge pass feeds both the integrity counts and the open-top check.
+    boundary_edges, nonmanifold_edges, boundary_edge_array = _edge_stats(mesh)
     degenerate_faces = _degenerate_face_count(mesh)
 
-    likely_open_top = _likely_open_top_from_boundary(mesh, boundary_edges=boundary_edges, tol_mm=0.5)
+    likely_open_top = _likely_open_top_from_boundary(mesh, boundary_edge_array, z_max, tol_mm=0.5)
 
     watertight = bool(mesh.is_watertight)
     is_volume = bool(mesh.is_volume)
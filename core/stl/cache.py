@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+from typing import Any, Dict
+
+from cachetools import LRUCache
+
+from core.config import cache_dir
+from .analyze import analyze_stl
+
+# Bump when analyze_stl's output (fields or heuristics) changes so stale entries are ignored.
+SCHEMA_VERSION = 1
+
+
+def _enabled() -> bool:
+    return os.getenv("SLICEBUDDY_STL_CACHE", "true").lower() in ("1", "true", "yes")
+
+
+def _max_disk_entries() -> int:
+    """Disk tier cap (one JSON file per unique STL); least recently used entries are pruned past it."""
+    return int(os.getenv("SLICEBUDDY_STL_CACHE_MAX_ENTRIES", "2000"))
+
+
+def file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256(b"").hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return hashlib.sha256(buf).hexdigest()
+
+
+def _restore_tuples(feats: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON has no tuples: bring bbox/bounds back to the shapes analyze_stl returns."""
+    feats["bbox_mm"] = tuple(feats["bbox_mm"])
+    feats["bounds_mm"] = tuple(tuple(b) for b in feats["bounds_mm"])
+    return feats
+
+
+# In-process tier, keyed by content digest only: every upload lands at a fresh temp path.
+_MEMORY: LRUCache = LRUCache(maxsize=128)
+_MEMORY_LOCK = threading.Lock()
+
+
+def _cached_features(digest: str, path: str) -> Dict[str, Any]:
+    with _MEMORY_LOCK:
+        feats = _MEMORY.get(digest)
+    if feats is None:
+        feats = _load_or_analyze(digest, path)
+        with _MEMORY_LOCK:
+            _MEMORY[digest] = feats
+    return feats
+
+
+def _load_or_analyze(digest: str, path: str) -> Dict[str, Any]:
+    # Disk tier; `path` is only read on a miss.
+    entry = cache_dir("stl", f"v{SCHEMA_VERSION}", f"{digest}.json")
+    try:
+        feats = _restore_tuples(json.loads(entry.read_text(encoding="utf-8")))
+        os.utime(entry)  # mtime = last use, for _prune_disk
+        return feats
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    feats = analyze_stl(path)
+    try:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        # write-then-rename so concurrent readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(feats, f)
+        os.replace(tmp, entry)
+        _prune_disk(str(entry.parent), _max_disk_entries())
+    except OSError:
+        pass  # cache is best-effort
+    return feats
+
+
+def _prune_disk(directory: str, max_entries: int) -> None:
+    """Drop the least recently used entries (oldest mtime) beyond max_entries. Runs after each write (miss)."""
+    with os.scandir(directory) as it:
+        entries = [e for e in it if e.name.endswith(".json") and e.is_file()]
+    if len(entries) <= max_entries:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for e in entries[: len(entries) - max_entries]:
+        try:
+            os.remove(e.path)
+        except OSError:
+            pass  # already pruned by a concurrent writer
+
+
+def get_or_compute(path: str, digest: str | None = None) -> Dict[str, Any]:
+    """
+    analyze_stl(path), memoized by file content (sha256) in-process and on disk under
+    cache_dir("stl"). Pass `digest` if the caller already hashed the file.
+    Set SLICEBUDDY_STL_CACHE=false to always recompute.
+    """
+    if not _enabled():
+        return analyze_stl(path)
+    # shallow copy: callers may annotate their dict; the cached one stays pristine
+    return dict(_cached_features(digest or file_sha256(path), path))
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import os
+from typing import Tuple
+
+import numpy as np
+import trimesh
+
+# Binary STL: 80-byte header + uint32 triangle count, then one 50-byte record per triangle.
+_HEADER_BYTES = 84
+_RECORD_DTYPE = np.dtype([("normal", "<f4", (3,)), ("v", "<f4", (3, 3)), ("attr", "<u2")])
+
+
+def load_binary_stl(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+    """
+    Parse a binary STL into (vertices (3F, 3) float64, faces (F, 3), face_normals (F, 3)).
+    Returns None when the file isn't a well-formed binary STL (e.g. ASCII STL), so callers can fall back.
+    """
+    size = os.path.getsize(path)
+    if size < _HEADER_BYTES:
+        return None
+    with open(path, "rb") as f:
+        header = f.read(_HEADER_BYTES)
+        count = int(np.frombuffer(header, dtype="<u4", count=1, offset=80)[0])
+        if count == 0 or size != _HEADER_BYTES + count * _RECORD_DTYPE.itemsize:
+            return None
+        data = np.fromfile(f, dtype=_RECORD_DTYPE, count=count)
+
+    vertices = data["v"].reshape(-1, 3).astype(np.float64)
+    faces = np.arange(count * 3, dtype=np.int64).reshape(-1, 3)
+    return vertices, faces, data["normal"].astype(np.float64)
+
+
+def load_mesh(path: str) -> trimesh.Trimesh:
+    """
+    Load an STL as a single Trimesh. Binary STL (the common case) is parsed directly with numpy;
+    anything else goes through trimesh.load. process=True merges the per-triangle vertices either way,
+    matching trimesh.load, which the connectivity checks (watertight, edge counts) depend on.
+    """
+    parsed = load_binary_stl(path)
+    if parsed is not None:
+        vertices, faces, normals = parsed
+        return trimesh.Trimesh(vertices=vertices, faces=faces, face_normals=normals, process=True)
+
+    mesh = trimesh.load(path, force="mesh")
+    if isinstance(mesh, trimesh.Scene):
+        mesh = trimesh.util.concatenate([g for g in mesh.geometry.values()])
+    return mesh
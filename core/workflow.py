@@ -1,9 +1,8 @@
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from functools import lru_cache
 
+from core.config import load_env, use_llm_explainer
 from core.state import PlanState
 
 from core.nodes.intent_guard import intent_guard_node
@@ -15,10 +14,6 @@ from core.nodes.analyze_risks import analyze_risks_node
 from core.nodes.stl_analyze import stl_analyze_node
 from core.nodes.model_overview import model_overview_node
 
-# LLM-related nodes (optional)
-from core.nodes.explain_plan_llm import explain_plan_llm_node
-from core.nodes.rag_retrieve import rag_retrieve_node
-
 
 def ASSEMBLE_PLAN_node(state: PlanState) -> PlanState:
     desc = state.get("description", "")
@@ -39,27 +34,69 @@ def ASSEMBLE_PLAN_node(state: PlanState) -> PlanState:
     return state
 
 
-def build_plan_app():
-    graph = StateGraph(PlanState)
+# Main deterministic chain, run in this order after INTENT_GUARD lets the request through.
+DETERMINISTIC_CHAIN = (
+    ("STL_ANALYZE", stl_analyze_node),
+    ("MODEL_OVERVIEW", model_overview_node),
+    ("NORMALIZE_INPUT", normalize_input_node),
+    ("SELECT_MATERIAL", select_material_node),
+    ("PLAN_ORIENTATION", plan_orientation_node),
+    ("GENERATE_SLICER_SETTINGS", generate_slicer_settings_node),
+    ("ANALYZE_RISKS", analyze_risks_node),
+    ("ASSEMBLE_PLAN", ASSEMBLE_PLAN_node),
+)
+
+
+def run_deterministic_plan(state: PlanState) -> PlanState:
+    """
+    The no-LLM pipeline as one plain function: INTENT_GUARD, then DETERMINISTIC_CHAIN in order.
+    Same result as the graph without the explainer, minus LangGraph's per-node dispatch.
+    """
+    state = intent_guard_node(dict(state))  # nodes mutate their input; keep the caller's dict intact
+    if state.get("stop"):
+        return state
+    for _, node in DETERMINISTIC_CHAIN:
+        state = node(state)
+    return state
 
-    use_llm = os.getenv("USE_LLM_EXPLAINER", "true").lower() in ("1", "true", "yes")
+
+def build_plan_app(explain: bool = True):
+    """
+    Compile the planning graph.
+    explain=False stops once ASSEMBLE_PLAN and RAG_RETRIEVE are done so the caller can stream the explanation itself
+    (see explain_plan_llm_stream / the /plan/stream endpoint).
+    The compiled graph holds no per-request state, so each (explain, USE_LLM_EXPLAINER) variant is built
+    once per process and shared by every caller.
+    With USE_LLM_EXPLAINER=false the graph is a straight line, so a Runnable over run_deterministic_plan is
+    returned instead (same invoke interface).
+    """
+    load_env()  # USE_LLM_EXPLAINER may come from .env
+    use_llm = use_llm_explainer()
+    if not use_llm:
+        return RunnableLambda(run_deterministic_plan, name="PLAN")
+    return _compile_plan_app(explain, use_llm)
+
+
+@lru_cache(maxsize=4)
+def _compile_plan_app(explain: bool, use_llm: bool):
+    graph = StateGraph(PlanState)
 
     # ----------------------------
     # 1) Register nodes
     # ----------------------------
     graph.add_node("INTENT_GUARD", intent_guard_node)
-    graph.add_node("STL_ANALYZE", stl_analyze_node)
-    graph.add_node("NORMALIZE_INPUT", normalize_input_node)
-    graph.add_node("SELECT_MATERIAL", select_material_node)
-    graph.add_node("PLAN_ORIENTATION", plan_orientation_node)
-    graph.add_node("GENERATE_SLICER_SETTINGS", generate_slicer_settings_node)
-    graph.add_node("ANALYZE_RISKS", analyze_risks_node)
-    graph.add_node("ASSEMBLE_PLAN", ASSEMBLE_PLAN_node)
-    graph.add_node("MODEL_OVERVIEW", model_overview_node)
+    for name, node in DETERMINISTIC_CHAIN:
+        graph.add_node(name, node)
 
     if use_llm:
+        # LLM-related nodes (optional): imported only when the graph uses them, so the deterministic
+        # pipeline doesn't load the RAG stack (langchain documents, vector store, embeddings cache).
+        from core.nodes.explain_plan_llm import explain_plan_llm_node
+        from core.nodes.rag_retrieve import rag_retrieve_node
+
         graph.add_node("RAG_RETRIEVE", rag_retrieve_node)
-        graph.add_node("EXPLAIN_PLAN", explain_plan_llm_node)
+        if explain:
+            graph.add_node("EXPLAIN_PLAN", explain_plan_llm_node)
 
     # ----------------------------
     # 2) Wire edges (WITH guard)
@@ -70,28 +107,26 @@ def build_plan_app():
     # Otherwise continue to planning nodes.
     graph.add_conditional_edges(
         "INTENT_GUARD",
-        lambda s: "STOP" if s.get("stop") else "CONTINUE",
-        {
-            "STOP": END,
-            "CONTINUE": "STL_ANALYZE",
-        },
+        lambda s: END if s.get("stop") else "STL_ANALYZE",
+        [END, "STL_ANALYZE"],
     )
 
     # Main deterministic chain
-    graph.add_edge("STL_ANALYZE", "MODEL_OVERVIEW")
-    graph.add_edge("MODEL_OVERVIEW", "NORMALIZE_INPUT")
-    graph.add_edge("NORMALIZE_INPUT", "SELECT_MATERIAL")
-    graph.add_edge("SELECT_MATERIAL", "PLAN_ORIENTATION")
-    graph.add_edge("PLAN_ORIENTATION", "GENERATE_SLICER_SETTINGS")
-    graph.add_edge("GENERATE_SLICER_SETTINGS", "ANALYZE_RISKS")
-    graph.add_edge("ANALYZE_RISKS", "ASSEMBLE_PLAN")
-
-    # LLM path
+    for (src, _), (dst, _) in zip(DETERMINISTIC_CHAIN, DETERMINISTIC_CHAIN[1:]):
+        graph.add_edge(src, dst)
+
+    # RAG's query uses the height/width that STL_ANALYZE fills in from the bbox, so it forks there and
+    # its network round-trip overlaps the rest of the deterministic chain.
     if use_llm:
-        graph.add_edge("ASSEMBLE_PLAN", "RAG_RETRIEVE")
-        graph.add_edge("RAG_RETRIEVE", "EXPLAIN_PLAN")
+        graph.add_edge("STL_ANALYZE", "RAG_RETRIEVE")
+
+    # LLM path: EXPLAIN_PLAN waits for both the assembled plan and the RAG branch
+    if use_llm and explain:
+        graph.add_edge(["ASSEMBLE_PLAN", "RAG_RETRIEVE"], "EXPLAIN_PLAN")
         graph.add_edge("EXPLAIN_PLAN", END)
     else:
         graph.add_edge("ASSEMBLE_PLAN", END)
+        if use_llm:
+            graph.add_edge("RAG_RETRIEVE", END)
 
     return graph.compile()
\ No newline at end of file
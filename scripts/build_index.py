@@ -1,7 +1,8 @@
+from core.config import load_env
+load_env()
+
 from core.rag.index import build_or_update_index
-from dotenv import load_dotenv
-load_dotenv()
 
 if __name__ == "__main__":
     build_or_update_index()
-    print("✅ Chroma index built.")
\ No newline at end of file
+    print("✅ Vector index built.")
\ No newline at end of file
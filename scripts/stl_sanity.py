@@ -1,20 +1,39 @@
 import sys
+import numpy as np
 import trimesh
 
+from core.stl.fast_stl import load_binary_stl
+
+
+def _triangles(path: str) -> np.ndarray:
+    """(F, 3, 3) triangle vertices: binary STL parsed directly, anything else via trimesh."""
+    parsed = load_binary_stl(path)
+    if parsed is not None:
+        vertices, _, _ = parsed
+        return vertices.reshape(-1, 3, 3)
+    # process=False: extents/volume/area don't need merged vertices, so skip trimesh's mesh processing
+    return trimesh.load(path, force="mesh", process=False).triangles
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python scripts/stl_sanity.py path/to/file.stl")
         sys.exit(1)
 
     path = sys.argv[1]
-    mesh = trimesh.load(path, force="mesh")
+    tris = _triangles(path)
+    v0, v1, v2 = tris[:, 0], tris[:, 1], tris[:, 2]
+
+    # Same quantities as trimesh's mesh.extents / mesh.area / mesh.volume, in one pass over the triangles
+    extents = np.ptp(tris.reshape(-1, 3), axis=0)
+    area = 0.5 * np.linalg.norm(np.cross(v1 - v0, v2 - v0), axis=1).sum()
+    volume = np.einsum("ij,ij->i", v0, np.cross(v1, v2)).sum() / 6.0  # signed tetrahedra from the origin
 
     # Bounding box size (X, Y, Z) in the STL's units
-    extents = mesh.extents
     print("Loaded:", path)
     print("Extents (X,Y,Z):", extents)
-    print("Volume:", mesh.volume)
-    print("Surface area:", mesh.area)
+    print("Volume:", volume)
+    print("Surface area:", area)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
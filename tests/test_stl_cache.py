@@ -0,0 +1,55 @@
+import os
+
+import trimesh
+
+from core.stl import cache
+
+
+def _count_analyze_calls(monkeypatch):
+    calls = []
+    real = cache.analyze_stl
+
+    def counting(path):
+        calls.append(path)
+        return real(path)
+
+    monkeypatch.setattr(cache, "analyze_stl", counting)
+    monkeypatch.setattr(cache, "_MEMORY", type(cache._MEMORY)(maxsize=cache._MEMORY.maxsize))
+    return calls
+
+
+def test_same_bytes_at_different_paths_analyzed_once(tmp_path, monkeypatch):
+    # A regular file as the cache root: the disk tier can't write, so only the in-process tier can hit.
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    monkeypatch.setenv("SLICEBUDDY_CACHE_DIR", str(blocker))
+    calls = _count_analyze_calls(monkeypatch)
+
+    data = trimesh.creation.box((10, 20, 30)).export(file_type="stl")
+    first, second = tmp_path / "upload-a.stl", tmp_path / "upload-b.stl"
+    first.write_bytes(data)
+    second.write_bytes(data)
+
+    assert cache.get_or_compute(str(first)) == cache.get_or_compute(str(second))
+    assert calls == [str(first)]
+
+
+def test_disk_tier_prunes_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setenv("SLICEBUDDY_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("SLICEBUDDY_STL_CACHE_MAX_ENTRIES", "2")
+    _count_analyze_calls(monkeypatch)
+
+    paths = []
+    for i, size in enumerate((10, 20, 30)):
+        path = tmp_path / f"upload-{i}.stl"
+        path.write_bytes(trimesh.creation.box((size, size, size)).export(file_type="stl"))
+        paths.append(str(path))
+    digests = [cache.file_sha256(p) for p in paths]
+    entries = tmp_path / "cache" / "stl" / f"v{cache.SCHEMA_VERSION}"
+
+    cache.get_or_compute(paths[0])
+    cache.get_or_compute(paths[1])
+    os.utime(entries / f"{digests[1]}.json", (0, 0))  # make the second entry the least recently used
+    cache.get_or_compute(paths[2])
+
+    assert sorted(p.stem for p in entries.glob("*.json")) == sorted((digests[0], digests[2]))
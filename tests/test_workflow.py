@@ -0,0 +1,26 @@
+import trimesh
+from langchain_core.documents import Document
+
+from core.nodes import rag_retrieve
+from core.workflow import build_plan_app
+
+
+def test_rag_query_uses_stl_dimensions(tmp_path, monkeypatch):
+    monkeypatch.setenv("USE_LLM_EXPLAINER", "true")
+    queries = []
+
+    def fake_retrieve(query, k=3):
+        queries.append(query)
+        return [Document(page_content="Use a brim for tall prints.", metadata={"source": "kb.md"})]
+
+    monkeypatch.setattr(rag_retrieve, "retrieve", fake_retrieve)
+    stl = tmp_path / "tower.stl"
+    stl.write_bytes(trimesh.creation.box((20, 10, 80)).export(file_type="stl"))
+
+    result = build_plan_app(explain=False).invoke({"description": "phone stand for my desk", "stl_path": str(stl)})
+
+    assert queries == [
+        "phone stand for my desk. height 80.0mm width 20.0mm. "
+        "brim supports tall print walls infill bed adhesion materials PLA PETG ABS ASA TPU."
+    ]
+    assert result["rag_sources"] == ["kb.md"] and result["plan"]
@@ -4,6 +4,7 @@ import React, { useEffect, useMemo, useRef, useState } from "react";
 import Image from "next/image";
 import ReactMarkdown from "react-markdown";
 import remarkGfm from "remark-gfm";
+import "./page.css"; // static styles, loaded once instead of injected by styled-jsx on every render
 
 type ChatMsg = {
   role: "user" | "bot";
@@ -85,6 +86,54 @@ function fmtDims(payload: any) {
   return `${x.toFixed(1)} × ${y.toFixed(1)} × ${z.toFixed(1)} mm`;
 }
 
+// Category keyword patterns for guessOverviewFromDescription (built once, not per render)
+const CONTAINER_RE = /box|tray|bin|case|organizer|container|holder/;
+const FIDGET_RE = /fidget|twist|spinner|cube|worry|click/;
+const TOY_RE = /toy|ball|game|kid|kids|play/;
+const FUNCTIONAL_RE = /bracket|mount|clip|adapter|hinge|tool|stand|hook/;
+const DECOR_RE = /decor|ornament|statue|figurine|vase|art/;
+
+/** Parse a text/event-stream body into {event, data} records (data is JSON, one line per event). */
+async function* readSSE(body: ReadableStream<Uint8Array>): AsyncGenerator<{ event: string; data: any }> {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buf = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buf += decoder.decode(value, { stream: true });
+
+    let sep: number;
+    while ((sep = buf.indexOf("\n\n")) !== -1) {
+      const block = buf.slice(0, sep);
+      buf = buf.slice(sep + 2);
+
+      let event = "message";
+      const data: string[] = [];
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data.push(line.slice(6));
+      }
+      yield { event, data: data.length ? JSON.parse(data.join("\n")) : null };
+    }
+  }
+}
+
+/** Append streamed explanation text to the newest plan message (new payload object, so its cards re-render). */
+function appendExplanation(messages: ChatMsg[], text: string): ChatMsg[] {
+  for (let i = messages.length - 1; i >= 0; i--) {
+    const m = messages[i];
+    if (m.kind !== "plan") continue;
+    const out = messages.slice();
+    out[i] = {
+      ...m,
+      planPayload: { ...m.planPayload, plan_explanation: safeStr(m.planPayload?.plan_explanation) + text },
+    };
+    return out;
+  }
+  return messages;
+}
+
 /**
  * Make a friendly, non-echoey overview based on keywords.
  * Goal: "Maybe it's a …" + practical print implications.
@@ -98,11 +147,11 @@ function guessOverviewFromDescription(descRaw: string, supports: string, bedLabe
   let printHint = "";
 
   // Broad categories
-  const isContainer = /box|tray|bin|case|organizer|container|holder/.test(desc);
-  const isFidget = /fidget|twist|spinner|cube|worry|click/.test(desc);
-  const isToy = /toy|ball|game|kid|kids|play/.test(desc);
-  const isFunctional = /bracket|mount|clip|adapter|hinge|tool|stand|hook/.test(desc);
-  const isDecor = /decor|ornament|statue|figurine|vase|art/.test(desc);
+  const isContainer = CONTAINER_RE.test(desc);
+  const isFidget = FIDGET_RE.test(desc);
+  const isToy = TOY_RE.test(desc);
+  const isFunctional = FUNCTIONAL_RE.test(desc);
+  const isDecor = DECOR_RE.test(desc);
 
   if (isFidget) guess = "a fidget / tactile toy";
   else if (isContainer) guess = "a small container / organizer";
@@ -255,14 +304,15 @@ export default function Page() {
       fd.append("use", trimmed);
       fd.append("stl", selectedFile);
 
-      const resp = await fetch("http://127.0.0.1:8000/plan", {
+      // SSE: the plan cards arrive as soon as the deterministic pipeline is done,
+      // then the LLM explanation streams in token by token.
+      const resp = await fetch("http://127.0.0.1:8000/plan/stream", {
         method: "POST",
         body: fd,
       });
 
-      popLoading();
-
-      if (!resp.ok) {
+      if (!resp.ok || !resp.body) {
+        popLoading();
         let bodyText = "";
         try {
           bodyText = await resp.text();
@@ -271,22 +321,28 @@ export default function Page() {
         return;
       }
 
-      const data = await resp.json();
+      for await (const { event, data } of readSSE(resp.body)) {
+        if (event === "plan") {
+          popLoading();
 
-      // If backend ever returns a stop message
-      if (data?.stop && data?.plan_explanation) {
-        pushBotText(safeStr(data.plan_explanation));
-        return;
-      }
-
-      // Instead of dumping markdown, render structured “plan cards”
-      setMessages((prev) => [
-        ...prev,
-        { role: "bot", kind: "plan", planPayload: data },
-      ]);
+          // If backend ever returns a stop message
+          if (data?.stop && data?.plan_explanation) {
+            pushBotText(safeStr(data.plan_explanation));
+            continue;
+          }
 
-      setUseText("");
-      // keep file selected
+          // Instead of dumping markdown, render structured “plan cards”
+          setMessages((prev) => [...prev, { role: "bot", kind: "plan", planPayload: data }]);
+          setUseText("");
+          // keep file selected
+        } else if (event === "token") {
+          setMessages((prev) => appendExplanation(prev, safeStr(data)));
+        } else if (event === "error") {
+          // LLM failed mid-stream: the server follows up with the deterministic model checks
+          setMessages((prev) => appendExplanation(prev, `\n\n_${safeStr(data?.message)}_\n`));
+        }
+      }
+      popLoading(); // stream ended without a plan event
     } catch (e: any) {
       popLoading();
       pushBotText(`Something went wrong while generating the plan. ${safeStr(e?.message)}`);
@@ -357,28 +413,7 @@ export default function Page() {
         <section className="sb-chat">
           <div className="sb-chatInner">
             {messages.map((m, idx) => (
-              <div key={idx} className={`sb-msg ${m.role === "user" ? "user" : "bot"}`}>
-                <div className="sb-msgLabel">{m.role === "user" ? "You" : "SliceBuddy"}</div>
-
-                <div className="sb-msgBubble">
-                  {/* user text */}
-                  {m.kind === "text" && m.role === "user" && <div>{m.text}</div>}
-
-                  {/* bot text */}
-                  {m.kind === "text" && m.role === "bot" && <div>{m.text}</div>}
-
-                  {/* loading */}
-                  {m.kind === "loading" && (
-                    <div className="sb-loadingRow">
-                      <div className="sb-spinner" aria-label="Loading" />
-                      <div className="sb-loadingText">Generating your print plan…</div>
-                    </div>
-                  )}
-
-                  {/* plan cards */}
-                  {m.kind === "plan" && m.role === "bot" && <PlanCards payload={m.planPayload} />}
-                </div>
-              </div>
+              <ChatMessage key={idx} m={m} />
             ))}
             <div ref={chatEndRef} />
           </div>
@@ -431,312 +466,11 @@ export default function Page() {
           <div className="sb-footnote">Requirement: upload an STL + describe what it’s used for.</div>
         </footer>
       </main>
-
-      {/* Styles */}
-      <style jsx global>{`
-        :root{
-          --sb-green: #3FAE58;
-          --sb-bg: #F5F6F8;
-          --sb-border: rgba(0,0,0,0.08);
-          --sb-text: #111827;
-          --sb-muted: rgba(17,24,39,0.65);
-          --sb-card: #FFFFFF;
-        }
-
-        html, body {
-          height: 100%;
-          margin: 0;
-          background: var(--sb-bg);
-          color: var(--sb-text);
-          font-family: ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Helvetica, Arial;
-        }
-
-        .sb-root{
-          height: 100vh;
-          display: grid;
-          grid-template-columns: 320px 1fr;
-          overflow: hidden;
-        }
-
-        /* Sidebar */
-        .sb-sidebar{
-          background: #fff;
-          border-right: 1px solid var(--sb-border);
-          display: flex;
-          flex-direction: column;
-          min-width: 0;
-        }
-
-        .sb-sidebarTop{ padding: 18px; }
-        .sb-brand{
-          width: 100%;
-          display: flex;
-          justify-content: flex-start;
-          padding: 10px 6px 18px;
-        }
-
-        .sb-brandBlock{
-          display: flex;
-          flex-direction: column;
-          align-items: flex-start;
-          gap: 10px;
-        }
-
-        .sb-logo{
-          width: 220px;
-          height: auto;
-          object-fit: contain;
-          display: block;
-        }
-
-        .sb-subtitle{
-          font-size: 14px;
-          color: var(--sb-muted);
-          margin-left: 2px;
-        }
-
-        .sb-newBtn{
-          width: 100%;
-          padding: 12px 14px;
-          border-radius: 10px;
-          border: 1px solid var(--sb-border);
-          background: #fff;
-          color: var(--sb-text);
-          font-weight: 700;
-          cursor: pointer;
-        }
-        .sb-newBtn:disabled{ opacity: 0.7; cursor: not-allowed; }
-
-        .sb-newBtn:hover{ border-color: rgba(0,0,0,0.16); }
-
-        .sb-sectionTitle{
-          margin-top: 18px;
-          margin-bottom: 10px;
-          font-size: 12px;
-          font-weight: 800;
-          letter-spacing: 0.08em;
-          color: rgba(17,24,39,0.55);
-        }
-
-        .sb-plans{ display: flex; flex-direction: column; gap: 10px; }
-
-        .sb-planEmpty{
-          padding: 14px;
-          border-radius: 12px;
-          border: 1px solid var(--sb-border);
-          background: rgba(0,0,0,0.02);
-        }
-
-        .sb-planEmptyTitle{ font-weight: 800; margin-bottom: 6px; }
-        .sb-planEmptyHint{ font-size: 13px; color: var(--sb-muted); }
-
-        .sb-planItem{
-          text-align: left;
-          padding: 12px 12px;
-          border-radius: 12px;
-          border: 1px solid var(--sb-border);
-          background: #fff;
-          cursor: pointer;
-        }
-        .sb-planItem:disabled{ opacity: 0.7; cursor: not-allowed; }
-
-        .sb-planItem.active{
-          border-color: rgba(63,174,88,0.65);
-          box-shadow: 0 0 0 3px rgba(63,174,88,0.12);
-        }
-
-        .sb-planTitle{ font-weight: 800; }
-        .sb-planMeta{ font-size: 12px; color: var(--sb-muted); margin-top: 4px; }
-
-        .sb-sidebarBottom{ margin-top: auto; padding: 18px; }
-        .sb-userDot{ width: 38px; height: 38px; border-radius: 999px; background: rgba(0,0,0,0.08); }
-
-        /* Main */
-        .sb-main{
-          display: flex;
-          flex-direction: column;
-          min-width: 0;
-          min-height: 0; /* IMPORTANT for scrolling */
-        }
-
-        .sb-topbar{
-          background: var(--sb-green);
-          height: 56px;
-          display: flex;
-          align-items: center;
-          padding: 0 18px;
-          color: #fff;
-          font-weight: 900;
-          border-bottom: 1px solid rgba(0,0,0,0.12);
-          flex: 0 0 auto;
-        }
-
-        /* Chat must be scrollable */
-        .sb-chat{
-          flex: 1 1 auto;
-          min-height: 0;         /* IMPORTANT */
-          overflow-y: auto;      /* IMPORTANT */
-          padding: 18px;
-        }
-
-        .sb-chatInner{
-          max-width: 920px;
-          margin: 0 auto;
-          display: flex;
-          flex-direction: column;
-          gap: 14px;
-          padding-bottom: 14px;
-        }
-
-        .sb-msg{ display: flex; flex-direction: column; gap: 6px; }
-        .sb-msgLabel{ font-size: 12px; font-weight: 900; color: rgba(17,24,39,0.7); }
-
-        .sb-msgBubble{
-          background: var(--sb-card);
-          border: 1px solid var(--sb-border);
-          border-radius: 14px;
-          padding: 14px;
-          color: var(--sb-text);
-          line-height: 1.45;
-          overflow-wrap: anywhere;
-        }
-
-        .sb-msg.user .sb-msgBubble{
-          background: rgba(63,174,88,0.08);
-          border-color: rgba(63,174,88,0.20);
-        }
-
-        /* Loading */
-        .sb-loadingRow{
-          display: flex;
-          align-items: center;
-          gap: 10px;
-        }
-        .sb-spinner{
-          width: 18px;
-          height: 18px;
-          border-radius: 999px;
-          border: 3px solid rgba(0,0,0,0.12);
-          border-top-color: rgba(63,174,88,0.95);
-          animation: sbspin 0.9s linear infinite;
-        }
-        @keyframes sbspin { to { transform: rotate(360deg); } }
-        .sb-loadingText{ color: rgba(17,24,39,0.75); font-weight: 700; }
-
-        /* Composer */
-        .sb-composerBar{
-          background: var(--sb-green);
-          border-top: 1px solid rgba(0,0,0,0.12);
-          padding: 8px 12px;
-          flex: 0 0 auto;
-        }
-
-        .sb-composer{
-          max-width: 920px;
-          margin: 0 auto;
-          display: grid;
-          grid-template-columns: 64px 1fr 110px 140px;
-          gap: 12px;
-          align-items: stretch;
-        }
-
-        .sb-plusBtn, .sb-clearBtn, .sb-sendBtn, .sb-input{ height: 44px; }
-
-        .sb-plusBtn{
-          border: none;
-          border-radius: 12px;
-          background: #fff;
-          color: #111827;
-          font-size: 28px;
-          font-weight: 900;
-          cursor: pointer;
-          box-shadow: 0 2px 0 rgba(0,0,0,0.12);
-        }
-        .sb-plusBtn:disabled{ opacity: 0.75; cursor: not-allowed; }
-
-        .sb-inputWrap{
-          display: flex;
-          flex-direction: column;
-          gap: 6px;
-          min-width: 0;
-        }
-
-        .sb-input{
-          width: 100%;
-          border-radius: 12px;
-          border: 2px solid rgba(0,0,0,0.20);
-          padding: 0 16px;
-          font-size: 15px;
-          outline: none;
-          background: #fff;
-        }
-        .sb-input:disabled{ opacity: 0.85; }
-
-        .sb-fileHint{
-          font-size: 13px;
-          color: rgba(255,255,255,0.92);
-          white-space: nowrap;
-          overflow: hidden;
-          text-overflow: ellipsis;
-          padding-left: 2px;
-        }
-
-        .sb-clearBtn{
-          border: none;
-          border-radius: 12px;
-          background: #fff;
-          font-weight: 900;
-          cursor: pointer;
-          box-shadow: 0 2px 0 rgba(0,0,0,0.12);
-        }
-        .sb-clearBtn:disabled{ opacity: 0.75; cursor: not-allowed; }
-
-        .sb-sendBtn{
-          border: none;
-          border-radius: 12px;
-          background: rgba(255,255,255,0.55);
-          color: rgba(17,24,39,0.45);
-          font-weight: 900;
-          cursor: pointer;
-          box-shadow: 0 2px 0 rgba(0,0,0,0.12);
-        }
-
-        .sb-sendBtn.ready{
-          background: #BFF0C8;
-          color: #0b3d1b;
-        }
-
-        .sb-sendBtn:disabled{ opacity: 0.8; cursor: not-allowed; }
-
-        .sb-footnote{
-          display: none;
-        }
-        @media (max-width: 760px){
-          .sb-footnote{
-            display: block;
-            max-width: 920px;
-            margin: 6px auto 0;
-            font-size: 12px;
-            color: rgba(255,255,255,0.95);
-          }
-        }
-
-        @media (max-width: 980px){
-          .sb-root{ grid-template-columns: 280px 1fr; }
-          .sb-composer{ grid-template-columns: 56px 1fr 90px 120px; }
-        }
-        @media (max-width: 760px){
-          .sb-root{ grid-template-columns: 1fr; }
-          .sb-sidebar{ display:none; }
-          .sb-composer{ grid-template-columns: 56px 1fr 120px; }
-          .sb-clearBtn{ display:none; }
-        }
-      `}</style>
     </div>
   );
 }
 
-function PlanCards({ payload }: { payload: any }) {
+function PlanCardsView({ payload }: { payload: any }) {
   const plan = payload?.plan || {};
   const material = plan?.material || payload?.material || {};
   const orientation = plan?.orientation || payload?.orientation || {};
@@ -866,89 +600,42 @@ function PlanCards({ payload }: { payload: any }) {
           </div>
         </details>
       )}
+    </div>
+  );
+}
 
-      {/* plan styles */}
-      <style jsx>{`
-        .sb-planWrap{ display:flex; flex-direction:column; gap: 14px; }
-
-        .sb-cardGrid{
-          display:grid;
-          grid-template-columns: 1fr 1fr;
-          gap: 12px;
-        }
+// Messages are never mutated in place (a streamed token replaces only its own message object), so after a
+// submission only the new / changed rows render instead of the whole thread.
+const ChatMessage = React.memo(function ChatMessage({ m }: { m: ChatMsg }) {
+  return (
+    <div className={`sb-msg ${m.role === "user" ? "user" : "bot"}`}>
+      <div className="sb-msgLabel">{m.role === "user" ? "You" : "SliceBuddy"}</div>
 
-        .sb-overview{
-          font-size: 15px;
-          color: rgba(17,24,39,0.92);
-          line-height: 1.45;
-        }
+      <div className="sb-msgBubble">
+        {/* user text */}
+        {m.kind === "text" && m.role === "user" && <div>{m.text}</div>}
 
-        .sb-chipRow{
-          display:flex;
-          flex-wrap:wrap;
-          gap: 8px;
-          margin-top: 10px;
-        }
+        {/* bot text */}
+        {m.kind === "text" && m.role === "bot" && <div>{m.text}</div>}
 
-        .sb-chip{
-          font-size: 12px;
-          font-weight: 800;
-          padding: 7px 10px;
-          border-radius: 999px;
-          border: 1px solid rgba(0,0,0,0.10);
-          background: rgba(0,0,0,0.03);
-        }
-        .sb-chip.ok{ background: rgba(63,174,88,0.12); border-color: rgba(63,174,88,0.20); }
-        .sb-chip.warn{ background: rgba(255,170,0,0.12); border-color: rgba(255,170,0,0.20); }
-        .sb-chip.bad{ background: rgba(255,60,60,0.10); border-color: rgba(255,60,60,0.20); }
-        .sb-chip.good{ background: rgba(63,174,88,0.12); border-color: rgba(63,174,88,0.20); }
-        .sb-chip.muted{ background: rgba(0,0,0,0.03); border-color: rgba(0,0,0,0.10); }
-
-        .sb-hint{
-          margin-top: 10px;
-          font-size: 13px;
-          color: rgba(17,24,39,0.65);
-          font-weight: 700;
-        }
-
-        .sb-warnList{ display:flex; flex-direction:column; gap: 10px; }
-        .sb-warnItem{ display:flex; gap: 10px; align-items:flex-start; }
-        .sb-sev{
-          font-size: 12px;
-          font-weight: 900;
-          padding: 4px 8px;
-          border-radius: 10px;
-          border: 1px solid rgba(0,0,0,0.10);
-        }
-        .sb-sevHigh{ background: rgba(255,60,60,0.12); border-color: rgba(255,60,60,0.20); }
-        .sb-sevMed{ background: rgba(255,170,0,0.14); border-color: rgba(255,170,0,0.22); }
-        .sb-sevLow{ background: rgba(63,174,88,0.14); border-color: rgba(63,174,88,0.22); }
-        .sb-warnText{ font-weight: 700; color: rgba(17,24,39,0.85); }
-
-        .sb-advanced{
-          border: 1px solid rgba(0,0,0,0.10);
-          border-radius: 14px;
-          padding: 12px 12px;
-          background: rgba(0,0,0,0.02);
-        }
-        .sb-advanced summary{
-          cursor: pointer;
-          font-weight: 900;
-          color: rgba(17,24,39,0.85);
-        }
-        .sb-advancedBody{
-          margin-top: 10px;
-          font-size: 14px;
-          line-height: 1.5;
-        }
+        {/* loading */}
+        {m.kind === "loading" && (
+          <div className="sb-loadingRow">
+            <div className="sb-spinner" aria-label="Loading" />
+            <div className="sb-loadingText">Generating your print plan…</div>
+          </div>
+        )}
 
-        @media (max-width: 760px){
-          .sb-cardGrid{ grid-template-columns: 1fr; }
-        }
-      `}</style>
+        {/* plan cards */}
+        {m.kind === "plan" && m.role === "bot" && <PlanCards payload={m.planPayload} />}
+      </div>
     </div>
   );
-}
+});
+
+// Typing in the composer re-renders the page; a plan's payload only changes while its explanation streams in,
+// so skip re-rendering its cards otherwise.
+const PlanCards = React.memo(PlanCardsView);
 
 function Card({ title, subtitle, children }: { title: string; subtitle?: string; children: React.ReactNode }) {
   return (
@@ -958,33 +645,6 @@ function Card({ title, subtitle, children }: { title: string; subtitle?: string;
         {subtitle && <div className="sb-cardSub">{subtitle}</div>}
       </div>
       <div className="sb-cardBody">{children}</div>
-
-      <style jsx>{`
-        .sb-card{
-          border: 1px solid rgba(0,0,0,0.10);
-          border-radius: 16px;
-          background: #fff;
-          box-shadow: 0 1px 0 rgba(0,0,0,0.04);
-          overflow: hidden;
-        }
-        .sb-cardHead{
-          padding: 12px 14px;
-          border-bottom: 1px solid rgba(0,0,0,0.06);
-          background: rgba(0,0,0,0.02);
-        }
-        .sb-cardTitle{
-          font-weight: 950;
-          font-size: 14px;
-          letter-spacing: 0.2px;
-        }
-        .sb-cardSub{
-          margin-top: 4px;
-          font-size: 12px;
-          color: rgba(17,24,39,0.62);
-          font-weight: 700;
-        }
-        .sb-cardBody{ padding: 12px 14px; }
-      `}</style>
     </div>
   );
 }
@@ -995,28 +655,6 @@ function KV({ k, v }: { k: string; v: string }) {
     <div className="sb-kv">
       <div className="sb-k">{k}</div>
       <div className="sb-v">{v}</div>
-
-      <style jsx>{`
-        .sb-kv{
-          display:grid;
-          grid-template-columns: 140px 1fr;
-          gap: 10px;
-          padding: 8px 0;
-          border-bottom: 1px dashed rgba(0,0,0,0.08);
-        }
-        .sb-k{
-          font-size: 12px;
-          color: rgba(17,24,39,0.55);
-          font-weight: 900;
-          text-transform: uppercase;
-          letter-spacing: 0.06em;
-        }
-        .sb-v{
-          font-size: 14px;
-          color: rgba(17,24,39,0.90);
-          font-weight: 750;
-        }
-      `}</style>
     </div>
   );
 }